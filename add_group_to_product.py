@@ -1,69 +1,45 @@
 import sys
-from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QTextEdit, QFrame, QCheckBox, QProgressBar
+from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QFrame, QCheckBox, QProgressBar
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 
-from login_handler import LoginManager
-from config import BASE_URL
+from browser_pool import BrowserPool
+from job_queue import get_job_queue
+from log_pipeline import LogSink
+from log_view import LogView
+from workflows import ProductGroupWorkflow
 
 
 
 class AutomationWorker(QThread):
-    log_update = pyqtSignal(str)
-    progress_update = pyqtSignal(int)
     finished = pyqtSignal()
 
-    def __init__(self, username, password, product_ids, group_name, headless):
+    def __init__(self, username, password, product_ids, group_name, headless, browser_pool, log_sink, resume=False):
         super().__init__()
         self.username = username
         self.password = password
         self.product_ids = product_ids  # List of product IDs
         self.group_name = group_name
         self.headless = headless
+        self.browser_pool = browser_pool
+        self.log_sink = log_sink
+        self.resume = resume
 
     def run(self):
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=self.headless)
-            page = browser.new_page()
-
-            try:
-                login_manager = LoginManager(self.username, self.password)
-                if not login_manager.login(page):
-                    self.error_occurred.emit("Login failed. Please check your username and password.")
-                    return
-
-                for product_id in self.product_ids:  # Iterate over each product ID
-                    self.add_product_to_group(page, product_id)
-            except Exception as e:
-                self.log_update.emit(f"An error occurred: {str(e)}")
-            finally:
-                browser.close()
-                self.finished.emit()
-
-
-
-    def add_product_to_group(self, page, product_id):
-        self.log_update.emit(f"Navigating to product page for ID: {product_id}")
-        self.progress_update.emit(60)
-        page.goto(f"{BASE_URL}/SA_prod_edit.asp?action=edit&recid={product_id}")
-
-        self.log_update.emit(f"Selecting group: {self.group_name} for product ID {product_id}")
-        self.progress_update.emit(80)
-        page.select_option("select#idOptionGroup", label=self.group_name)
-
-        self.log_update.emit(f"Clicking 'Add' button for product ID {product_id}")
-        page.wait_for_selector("button[type='submit']:has-text('Ajouter'):not(:has-text('le fournisseur'))")
-        page.click("button[type='submit']:has-text('Ajouter'):not(:has-text('le fournisseur'))")
-
-        self.log_update.emit(f"Added product {product_id} to group {self.group_name}")
-        self.progress_update.emit(100)
+        reporter = self.log_sink.reporter()
+        workflow = ProductGroupWorkflow(self.product_ids, self.group_name, self.browser_pool, self.headless, reporter,
+                                        resume=self.resume)
+        try:
+            self.browser_pool.engine.run(workflow.run())
+        finally:
+            self.finished.emit()
 
 
 class Add_Group_to_ProductGUI(QMainWindow):
-    def __init__(self, username, password):
+    def __init__(self, username, password, browser_pool=None):
         super().__init__()
         self.username = username
         self.password = password
+        self.browser_pool = browser_pool or BrowserPool(username, password)
         self.setWindowTitle("Product Group Automation")
         self.setGeometry(100, 100, 600, 600)
 
@@ -102,18 +78,28 @@ class Add_Group_to_ProductGUI(QMainWindow):
         self.headless_checkbox.setChecked(True)
         input_layout.addWidget(self.headless_checkbox)
 
+        # Resume checkbox
+        self.resume_checkbox = QCheckBox("Resume previous run")
+        input_layout.addWidget(self.resume_checkbox)
+
         # Start button
         self.start_button = QPushButton("Start Automation")
         self.start_button.clicked.connect(self.start_automation)
         input_layout.addWidget(self.start_button)
 
+        # Queue button
+        self.queue_button = QPushButton("Add to Queue")
+        self.queue_button.clicked.connect(self.queue_automation)
+        input_layout.addWidget(self.queue_button)
+
         # Progress bar
         self.progress_bar = QProgressBar()
         main_layout.addWidget(self.progress_bar)
 
         # Log output
-        self.log_output = QTextEdit()
-        self.log_output.setReadOnly(True)
+        self.log_sink = LogSink("product-group")
+        self.log_output = LogView(self.log_sink)
+        self.log_output.progress_changed.connect(self.update_progress_bar)
         main_layout.addWidget(self.log_output)
 
     def create_input_field(self, label_text, layout):
@@ -132,18 +118,34 @@ class Add_Group_to_ProductGUI(QMainWindow):
         product_ids = self.get_product_ids()
         group_name = self.group_name_input.text().strip()
         headless = self.headless_checkbox.isChecked()
+        resume = self.resume_checkbox.isChecked()
 
         # Create the AutomationWorker thread with the passed username and password
-        self.automation_worker = AutomationWorker(self.username, self.password, product_ids, group_name, headless)
+        self.automation_worker = AutomationWorker(self.username, self.password, product_ids, group_name, headless, self.browser_pool,
+                                                 self.log_sink, resume)
 
-        # Connect signals for logging, progress updates, and when the process finishes
-        self.automation_worker.log_update.connect(self.log_message)
-        self.automation_worker.progress_update.connect(self.update_progress_bar)
+        # Log lines and progress reach the window through the log view; only completion is signalled
         self.automation_worker.finished.connect(self.on_automation_finished)
 
+        self.start_button.setDisabled(True)
         # Start the automation thread
         self.automation_worker.start()
 
+    def queue_automation(self):
+        product_ids = self.get_product_ids()
+        group_name = self.group_name_input.text().strip()
+        if not product_ids or not group_name:
+            self.log_message("Please enter a group name and at least one product ID.")
+            return
+
+        job_id = get_job_queue().enqueue("product-group", {
+            "group": group_name,
+            "product_ids": product_ids,
+            "headless": self.headless_checkbox.isChecked(),
+            "resume": self.resume_checkbox.isChecked(),
+        })
+        self.log_message(f"Job {job_id} queued: group '{group_name}' for {len(product_ids)} products.")
+
     def log_message(self, message):
         # Method to update the log display
         self.log_output.append(message)
@@ -154,6 +156,7 @@ class Add_Group_to_ProductGUI(QMainWindow):
 
     def on_automation_finished(self):
         # Method to handle cleanup when automation finishes
+        self.start_button.setDisabled(False)
         self.log_message("Automation completed.")
         self.progress_bar.setValue(100)
 
@@ -192,12 +195,12 @@ class Add_Group_to_ProductGUI(QMainWindow):
             QPushButton:hover {
                 background-color: #2980b9;
             }
-            QLineEdit, QTextEdit {
+            QLineEdit, QTextEdit, QListView {
                 border: 1px solid #cccccc;
                 border-radius: 8px;
                 padding: 8px;
             }
-            QLineEdit:focus, QTextEdit:focus {
+            QLineEdit:focus, QTextEdit:focus, QListView:focus {
                 border: 1px solid #3498db;
             }
             QProgressBar {
@@ -209,7 +212,7 @@ class Add_Group_to_ProductGUI(QMainWindow):
                 background-color: #3498db;
                 border-radius: 8px;
             }
-            QTextEdit {
+            QTextEdit, QListView {
                 background-color: #f6f6f6;
             }
         """)
@@ -1,108 +1,45 @@
 
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, 
-                             QLineEdit, QTextEdit, QProgressBar, QMessageBox, QGridLayout, QFrame,
+                             QLineEdit, QProgressBar, QMessageBox, QGridLayout, QFrame,
                              QListWidget, QListWidgetItem, QCheckBox)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
-import time
 
-from login_handler import LoginManager
-from config import BASE_URL
+from browser_pool import BrowserPool
+from config import GROUP_BATCH_MODE
+from job_queue import get_job_queue
+from log_pipeline import LogSink
+from log_view import LogView
+from workflows import GroupOptionsWorkflow
 
 
 class PlaywrightWorker(QThread):
-    progress_update = pyqtSignal(int)
-    status_update = pyqtSignal(str)
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, username, password, group_name, options, headless):
+    def __init__(self, username, password, group_name, options, headless, browser_pool, log_sink,
+                 batch=GROUP_BATCH_MODE, resume=False):
         super().__init__()
         self.username = username
         self.password = password
         self.group_name = group_name
         self.options = options
         self.headless = headless
+        self.browser_pool = browser_pool
+        self.log_sink = log_sink
+        self.batch = batch
+        self.resume = resume
 
     def run(self):
-        with sync_playwright() as p:
-            try:
-                browser = p.chromium.launch(headless=self.headless)
-                context = browser.new_context()
-                page = context.new_page()
-
-                login_manager = LoginManager(self.username, self.password)
-                if not login_manager.login(page):
-                    self.error_occurred.emit("Login failed. Please check your username and password.")
-                    return
-
-                if not self.navigate_to_option_group(page, self.group_name):
-                    return
-
-                total_options = len(self.options)
-                for i, option_name in enumerate(self.options, 1):
-                    if not self.add_option_to_group(page, option_name):
-                        continue
-                    progress = int((i / total_options) * 100)
-                    self.progress_update.emit(progress)
-                    self.status_update.emit(f"Added option: {option_name}")
-                    time.sleep(1)
-
-                self.status_update.emit("Process completed successfully.")
-            except Exception as e:
-                self.error_occurred.emit(f"An unexpected error occurred: {str(e)}")
-            finally:
-                if 'context' in locals():
-                    context.close()
-                if 'browser' in locals():
-                    browser.close()
-
-    
-
-    def navigate_to_option_group(self, page, group_name):
-        try:
-            self.status_update.emit(f"Navigating to option group: {group_name}")
-            page.goto(f"{BASE_URL}/options/optionsgroupslist.asp")
-            page.fill("#psearch", group_name)
-            page.click('button:has-text("Rechercher")')
-
-            page.wait_for_load_state("networkidle")
-            
-            if page.locator('img[alt=" Ajouter/retirer des options "]').count() == 0:
-                self.error_occurred.emit(f"Option group '{group_name}' not found. Please check the group name.")
-                return False
-            
-            page.click('img[alt=" Ajouter/retirer des options "]')
-            page.wait_for_load_state("networkidle")
-            return True
-        except Exception as e:
-            self.error_occurred.emit(f"Error navigating to option group: {str(e)}")
-            return False
-
-    def add_option_to_group(self, page, option_name):
-        try:
-            self.status_update.emit(f"Adding option: {option_name}")
-            page.fill('input[name="rch"]', option_name.strip())
-            page.click('button:has-text("Rechercher")')
-            page.wait_for_load_state("networkidle")
-            
-            checkbox = page.locator('input[type="checkbox"][name="inclure0"]')
-            if checkbox.is_visible():
-                checkbox.check()
-                page.click("button:has-text('Mettre à jour')")
-                page.wait_for_load_state("networkidle")
-                return True
-            else:
-                self.error_occurred.emit(f"Option '{option_name}' not found. Skipping this option.")
-                return False
-        except Exception as e:
-            self.error_occurred.emit(f"Error adding option '{option_name}': {str(e)}")
-            return False
+        reporter = self.log_sink.reporter(error=self.error_occurred.emit)
+        workflow = GroupOptionsWorkflow(self.group_name, self.options, self.browser_pool, self.headless, reporter,
+                                        batch=self.batch, resume=self.resume)
+        self.browser_pool.engine.run(workflow.run())
 
 class RestoConcept_Option_ManagerGUI(QWidget):
-    def __init__(self, username, password):
+    def __init__(self, username, password, browser_pool=None):
         super().__init__()
         self.username = username
         self.password = password
+        self.browser_pool = browser_pool or BrowserPool(username, password)
         self.initUI()
 
     def initUI(self):
@@ -148,10 +85,21 @@ class RestoConcept_Option_ManagerGUI(QWidget):
         self.headless_checkbox.setChecked(True)
         left_layout.addWidget(self.headless_checkbox)
 
+        self.batch_checkbox = QCheckBox('Attach options in batches')
+        self.batch_checkbox.setChecked(GROUP_BATCH_MODE)
+        left_layout.addWidget(self.batch_checkbox)
+
+        self.resume_checkbox = QCheckBox('Resume previous run')
+        left_layout.addWidget(self.resume_checkbox)
+
         self.start_button = QPushButton('Start Process')
         self.start_button.clicked.connect(self.start_process)
         left_layout.addWidget(self.start_button)
 
+        self.queue_button = QPushButton('Add to Queue')
+        self.queue_button.clicked.connect(self.queue_process)
+        left_layout.addWidget(self.queue_button)
+
         left_panel.setLayout(left_layout)
         main_layout.addWidget(left_panel)
 
@@ -159,11 +107,13 @@ class RestoConcept_Option_ManagerGUI(QWidget):
         right_panel = QFrame()
         right_layout = QVBoxLayout()
 
-        self.status_text = QTextEdit()
-        self.status_text.setReadOnly(True)
-        right_layout.addWidget(self.status_text)
+        # Statuses are this tool's log, so the sink records them as lines too.
+        self.log_sink = LogSink("option-manager", log_status=True)
+        self.log_view = LogView(self.log_sink)
+        right_layout.addWidget(self.log_view)
 
         self.progress_bar = QProgressBar()
+        self.log_view.progress_changed.connect(self.update_progress)
         right_layout.addWidget(self.progress_bar)
 
         right_panel.setLayout(right_layout)
@@ -197,7 +147,7 @@ class RestoConcept_Option_ManagerGUI(QWidget):
             QPushButton:hover {
                 background-color: #166fe5;
             }
-            QLineEdit, QTextEdit {
+            QLineEdit, QTextEdit, QListView {
                 border: 1px solid #dddfe2;
                 border-radius: 6px;
                 padding: 8px;
@@ -258,24 +208,42 @@ class RestoConcept_Option_ManagerGUI(QWidget):
             return
 
         headless = self.headless_checkbox.isChecked()
+        batch = self.batch_checkbox.isChecked()
+        resume = self.resume_checkbox.isChecked()
 
-        self.thread = PlaywrightWorker(self.username, self.password, group_name, options, headless)
-        self.thread.progress_update.connect(self.update_progress)
-        self.thread.status_update.connect(self.update_status)
-        self.thread.error_occurred.connect(self.show_error)
+        self.thread = PlaywrightWorker(self.username, self.password, group_name, options, headless, self.browser_pool,
+                                       self.log_sink, batch, resume)
+        # The sink has already logged worker errors; only the dialog is left.
+        self.thread.error_occurred.connect(lambda message: QMessageBox.critical(self, "Error", message))
 
         self.start_button.setDisabled(True)
         self.thread.finished.connect(lambda: self.start_button.setDisabled(False))
         self.thread.start()
 
+    def queue_process(self):
+        group_name = self.group_input.text().strip()
+        options = [self.options_list.item(i).text().strip() for i in range(self.options_list.count())]
+        if not group_name or not options:
+            self.show_error("Please provide an option group and at least one option.")
+            return
+
+        job_id = get_job_queue().enqueue("group-options", {
+            "group": group_name,
+            "options": options,
+            "headless": self.headless_checkbox.isChecked(),
+            "batch": self.batch_checkbox.isChecked(),
+            "resume": self.resume_checkbox.isChecked(),
+        })
+        self.update_status(f"Job {job_id} queued: {len(options)} options for group '{group_name}'.")
+
     def update_progress(self, progress):
         self.progress_bar.setValue(progress)
 
     def update_status(self, message):
-        self.status_text.append(message)
+        self.log_view.append(message)
 
     def show_error(self, message):
-        self.status_text.append(f"<font color='red'>{message}</font>")
+        self.log_view.append(message, "ERROR")
         QMessageBox.critical(self, "Error", message)
 
 if __name__ == '__main__':
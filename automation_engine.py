@@ -0,0 +1,69 @@
+import asyncio
+import threading
+
+from playwright.async_api import async_playwright
+
+
+class AutomationEngine:
+    # One asyncio loop on one background thread drives every page. Qt threads
+    # hand coroutines to it and wait on the returned futures.
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._playwright = None
+        self._browsers = {}
+        self._browser_lock = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="automation-engine", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.start())
+
+    def run(self, coro):
+        return self.submit(coro).result()
+
+    async def browser(self, headless=True):
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+        async with self._browser_lock:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            browser = self._browsers.get(headless)
+            if browser is None or not browser.is_connected():
+                browser = await self._playwright.chromium.launch(headless=headless)
+                self._browsers[headless] = browser
+            return browser
+
+    async def _shutdown(self):
+        for browser in self._browsers.values():
+            try:
+                await browser.close()
+            except Exception:
+                pass
+        self._browsers.clear()
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        self._browser_lock = None
+
+    def close(self):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=30)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=10)
+            if not thread.is_alive():
+                loop.close()
@@ -0,0 +1,270 @@
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from mock_backoffice import BackOfficeState, start_server
+
+# Runs the workflows behind the three tool windows against the mock back office
+# and appends throughput, step latency and peak memory to the results file.
+
+SCENARIOS = ("upload-http", "upload-browser", "group-options", "group-options-single", "product-group")
+
+
+class CountingReporter:
+    def __init__(self):
+        self.errors = []
+
+    def progress(self, value):
+        pass
+
+    def status(self, message):
+        pass
+
+    def log(self, message):
+        pass
+
+    def error(self, message):
+        self.errors.append(message)
+
+    def circuit(self, state, message):
+        pass
+
+
+class MemorySampler:
+    # Resident memory of this process and its children (the browsers) when
+    # psutil is installed, otherwise this process's own peak.
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+        try:
+            import psutil
+            self._process = psutil.Process()
+        except ImportError:
+            self._process = None
+
+    def sample(self):
+        if self._process is None:
+            return 0
+        total = 0
+        for process in [self._process, *self._process.children(recursive=True)]:
+            try:
+                total += process.memory_info().rss
+            except Exception:
+                pass
+        return total
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.sample())
+
+    def __enter__(self):
+        self.peak = self.sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        if self._process is None:
+            try:
+                import resource
+                # ru_maxrss is in kilobytes on Linux.
+                self.peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+            except ImportError:
+                self.peak = 0
+
+    @property
+    def peak_mb(self):
+        return round(self.peak / (1024 * 1024), 1) if self.peak else None
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def time_steps(limiter, latencies):
+    # Every workflow step runs inside limiter.slot(); timing the slot body
+    # gives the step latency without the wait for a free slot.
+    original = limiter.slot
+
+    @asynccontextmanager
+    async def timed_slot():
+        async with original():
+            started = time.perf_counter()
+            try:
+                yield
+            finally:
+                latencies.append(time.perf_counter() - started)
+
+    limiter.slot = timed_slot
+
+
+def code_version():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def write_rows(path, prefix, count):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["optionDescrip", "ref", "pricetoadd", "prixpublic", "iddelai"])
+        for i in range(count):
+            writer.writerow([f"{prefix} option {i}", f"{prefix.upper()}{i:05d}", "1,50", "2", "1"])
+
+
+def build_scenario(name, args, state, scratch, browser_pool, reporter, run_id):
+    # Returns the workflow and a function counting what the server really got.
+    from workflows import GroupOptionsWorkflow, OptionUploadWorkflow, ProductGroupWorkflow
+
+    prefix = f"{name}-{run_id}"
+    if name.startswith("upload"):
+        path = os.path.join(scratch, f"{prefix}.csv")
+        write_rows(path, prefix, args.rows)
+        workflow = OptionUploadWorkflow(path, browser_pool, not args.headed, args.concurrency, reporter,
+                                        use_http=name == "upload-http")
+        return workflow, lambda: sum(1 for option in state.options.values()
+                                     if option["description"].startswith(prefix))
+
+    if name.startswith("group-options"):
+        names = []
+        with state.lock:
+            for i in range(args.rows):
+                description = f"{prefix} option {i}"
+                state.add_option(f"G{i:05d}{run_id}", description, "1", "1", "1")
+                names.append(description)
+            group_id = str(len(state.groups) + 1)
+            state.groups[group_id] = {"name": f"Groupe {prefix}", "members": set()}
+            recids = {option["recid"] for option in state.options.values() if option["description"] in names}
+        workflow = GroupOptionsWorkflow(f"Groupe {prefix}", names, browser_pool, not args.headed, reporter,
+                                        batch=name == "group-options")
+        return workflow, lambda: len(state.groups[group_id]["members"] & recids)
+
+    if name == "product-group":
+        with state.lock:
+            group_id = str(len(state.groups) + 1)
+            state.groups[group_id] = {"name": f"Groupe {prefix}", "members": set()}
+            product_ids = list(state.products)[:args.rows]
+        workflow = ProductGroupWorkflow(product_ids, f"Groupe {prefix}", browser_pool, not args.headed, reporter)
+        return workflow, lambda: sum(1 for product_id in product_ids if group_id in state.products[product_id])
+
+    raise ValueError(f"Unknown scenario '{name}'.")
+
+
+def previous_result(results_path, record):
+    match = None
+    try:
+        with open(results_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    previous = json.loads(line)
+                except ValueError:
+                    continue
+                if all(previous.get(key) == record[key] for key in ("scenario", "rows", "concurrency", "latency",
+                                                                    "error_rate")):
+                    match = previous
+    except OSError:
+        pass
+    return match
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the workflows against a local mock back office.")
+    parser.add_argument("scenarios", nargs="*", help=f"any of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--rows", type=int, default=200, help="items per scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds the mock adds to every response")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--expire-rate", type=float, default=0.0)
+    parser.add_argument("--throttled", action="store_true", help="keep the production rate limiter settings")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--label", help="stored with the results instead of the git revision")
+    parser.add_argument("--results", help="results file (default: BENCHMARK_RESULTS_PATH)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    scenarios = args.scenarios or list(SCENARIOS)
+
+    state = BackOfficeState(groups=10, products=max(200, args.rows))
+    server = start_server(state=state, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                          expire_rate=args.expire_rate)
+    scratch = tempfile.mkdtemp(prefix="chr-benchmark-")
+    # Must be set before the app modules read config.
+    os.environ["CHR_BASE_URL"] = server.base_url
+    os.environ["CHR_APP_DATA_DIR"] = scratch
+
+    from browser_pool import BrowserPool
+    from config import BENCHMARK_RESULTS_PATH
+    from rate_limiter import configure_rate_limiter
+    from step_metrics import get_step_metrics
+
+    results_path = args.results or BENCHMARK_RESULTS_PATH
+    version = args.label or code_version()
+    run_id = str(int(time.time()))
+    browser_pool = BrowserPool("benchmark", "benchmark")
+    try:
+        browser_pool.engine.run(browser_pool.start(not args.headed))
+        for name in scenarios:
+            latencies = []
+            if args.throttled:
+                limiter = configure_rate_limiter()
+            else:
+                limiter = configure_rate_limiter(initial_rate=1000.0, max_rate=1000.0)
+            time_steps(limiter, latencies)
+
+            get_step_metrics().reset()
+            reporter = CountingReporter()
+            workflow, completed = build_scenario(name, args, state, scratch, browser_pool, reporter, run_id)
+            requests_before = state.requests
+            with MemorySampler() as memory:
+                started = time.perf_counter()
+                browser_pool.engine.run(workflow.run())
+                seconds = time.perf_counter() - started
+
+            done = completed()
+            record = {
+                "at": time.time(), "version": version, "scenario": name, "rows": args.rows,
+                "concurrency": args.concurrency, "latency": args.latency, "error_rate": args.error_rate,
+                "seconds": round(seconds, 3), "completed": done, "items_per_second": round(done / seconds, 2),
+                "requests": state.requests - requests_before,
+                "p50_ms": round(percentile(latencies, 0.5) * 1000, 1) if latencies else None,
+                "p95_ms": round(percentile(latencies, 0.95) * 1000, 1) if latencies else None,
+                "peak_memory_mb": memory.peak_mb, "errors": len(reporter.errors),
+                "steps": get_step_metrics().summary(),
+            }
+            previous = previous_result(results_path, record)
+            with open(results_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+            line = (f"{name:22} {done}/{args.rows} in {seconds:6.2f}s  {record['items_per_second']:7.2f}/s  "
+                    f"p50 {record['p50_ms']} ms  p95 {record['p95_ms']} ms  "
+                    f"peak {record['peak_memory_mb']} MB  errors {record['errors']}")
+            if previous and previous.get("items_per_second"):
+                change = (record["items_per_second"] / previous["items_per_second"] - 1) * 100
+                line += f"  ({change:+.1f}% vs {previous['version']})"
+            print(line)
+    finally:
+        browser_pool.close()
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from automation_engine import AutomationEngine
+from config import LEAN_BROWSING
+from lean_profile import LeanProfile
+from login_handler import LoginManager
+from retry_policy import RetryPolicy
+from session_guard import SessionGuard
+from step_metrics import get_step_metrics
+
+
+class BrowserPool:
+    def __init__(self, username, password, engine=None, profile=None):
+        self.username = username
+        self.password = password
+        self.engine = engine or AutomationEngine()
+        self.profile = profile or (LeanProfile() if LEAN_BROWSING else None)
+        self.storage_state = None
+        self._idle = {}
+        self._login_lock = None
+        # Logins go through the same circuit breaker as the workflow actions.
+        self.retry = RetryPolicy()
+
+    def warm_up(self, headless=True):
+        # Errors resurface on the first lease, where the worker can report them.
+        return self.engine.submit(self.start(headless))
+
+    async def start(self, headless=True):
+        await self._ensure_logged_in(headless)
+
+    def _get_login_lock(self):
+        if self._login_lock is None:
+            self._login_lock = asyncio.Lock()
+        return self._login_lock
+
+    async def _ensure_logged_in(self, headless):
+        async with self._get_login_lock():
+            if self.storage_state is not None:
+                return self.storage_state
+            return await self.retry.run(lambda: self._login(headless), "Login")
+
+    async def renew_session(self, headless, stale):
+        # Called by every worker whose session expired; the first one logs in
+        # again and the rest get the storage state it created.
+        async with self._get_login_lock():
+            if self.storage_state is not None and self.storage_state is not stale:
+                return self.storage_state
+            await self.invalidate_session()
+            return await self.retry.run(lambda: self._login(headless, fresh=True), "Login")
+
+    async def _login(self, headless, fresh=False):
+        context = await self._new_context(headless)
+        try:
+            page = await context.new_page()
+            login_manager = LoginManager(self.username, self.password)
+            if fresh:
+                # The cached cookies are the ones that just expired.
+                login_manager.session_cache.clear()
+            with get_step_metrics().step("session", "login"):
+                logged_in = await login_manager.login(page)
+            if not logged_in:
+                raise RuntimeError("Login failed. Please check your username and password.")
+            self.storage_state = await context.storage_state()
+            await page.close()
+        except BaseException:
+            await context.close()
+            raise
+        self._idle.setdefault(headless, []).append(context)
+        return self.storage_state
+
+    def session_guard(self, context, headless):
+        # For a worker on a leased context: after a re-login the new cookies
+        # are copied into the context before the item is replayed.
+        async def move_to_session(storage_state):
+            await context.add_cookies(storage_state.get("cookies", []))
+
+        return SessionGuard(lambda stale: self.renew_session(headless, stale), self.storage_state, move_to_session)
+
+    async def _new_context(self, headless, storage_state=None):
+        browser = await self.engine.browser(headless)
+        context = await browser.new_context(storage_state=storage_state)
+        if self.profile is not None:
+            await self.profile.apply(context)
+        return context
+
+    async def invalidate_session(self):
+        self.storage_state = None
+        idle, self._idle = self._idle, {}
+        for contexts in idle.values():
+            for context in contexts:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+
+    @asynccontextmanager
+    async def lease(self, headless=True):
+        storage_state = await self._ensure_logged_in(headless)
+        idle = self._idle.setdefault(headless, [])
+        if idle:
+            context = idle.pop()
+        else:
+            context = await self._new_context(headless, storage_state)
+
+        healthy = False
+        try:
+            yield context
+            healthy = True
+        finally:
+            if healthy and self.storage_state is storage_state:
+                for page in context.pages:
+                    await page.close()
+                self._idle.setdefault(headless, []).append(context)
+            else:
+                await context.close()
+
+    def close(self):
+        self.engine.close()
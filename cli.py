@@ -0,0 +1,144 @@
+import argparse
+import getpass
+import json
+import os
+import sys
+import time
+
+from config import UPLOAD_CONCURRENCY, GROUP_BATCH_MODE, METRICS_PORT
+
+
+class JsonLinesReporter:
+    # Same interface as workflows.Reporter; every event is one JSON object per
+    # line on stdout so cron jobs and other tools can follow a run.
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.errors = 0
+
+    def emit(self, event, **fields):
+        fields.update(event=event, at=round(time.time(), 3))
+        self.stream.write(json.dumps(fields, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+    def progress(self, value):
+        self.emit("progress", value=value)
+
+    def status(self, message):
+        self.emit("status", message=message)
+
+    def log(self, message):
+        self.emit("log", message=message)
+
+    def error(self, message):
+        self.errors += 1
+        self.emit("error", message=message)
+
+    def circuit(self, state, message):
+        self.emit("circuit", state=state, message=message)
+
+
+def read_list(values, path):
+    items = [value.strip() for value in values or [] for value in value.split(",")]
+    if path:
+        with open(path, encoding="utf-8") as f:
+            items.extend(line.strip() for line in f)
+    return [item for item in items if item]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run RestoConcept option jobs without the GUI.")
+    parser.add_argument("--username", default=os.environ.get("CHR_USERNAME"),
+                        help="back-office user (default: $CHR_USERNAME)")
+    parser.add_argument("--password", default=os.environ.get("CHR_PASSWORD"),
+                        help="back-office password (default: $CHR_PASSWORD, else prompted)")
+    parser.add_argument("--headed", dest="headless", action="store_false", help="show the browser window")
+    parser.add_argument("--resume", action="store_true", help="skip items finished by the previous run")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help="serve per-step timings on this port at /metrics (Prometheus text format)")
+    parser.add_argument("--metrics-jsonl", help="append every timed step to this JSON-lines file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    upload = commands.add_parser("upload", help="create options from a spreadsheet")
+    upload.add_argument("file")
+    upload.add_argument("--concurrency", type=int, default=UPLOAD_CONCURRENCY)
+    upload.add_argument("--http", action="store_true", help="submit the forms over HTTP instead of a browser")
+    upload.add_argument("--processes", type=int, default=1,
+                        help="split the file across this many processes, each with its own browser (0: one per core)")
+
+    group_options = commands.add_parser("group-options", help="add options to an option group")
+    group_options.add_argument("group")
+    group_options.add_argument("--option", action="append", help="option name; repeat or separate with commas")
+    group_options.add_argument("--options-file", help="file with one option name per line")
+    group_options.add_argument("--one-by-one", dest="batch", action="store_false", default=GROUP_BATCH_MODE,
+                               help="search and attach each option separately")
+
+    product_group = commands.add_parser("product-group", help="assign an option group to products")
+    product_group.add_argument("group")
+    product_group.add_argument("--product", action="append", help="product ID; repeat or separate with commas")
+    product_group.add_argument("--products-file", help="file with one product ID per line")
+
+    sync = commands.add_parser("sync", help="bring the back office in line with a desired-state file")
+    sync.add_argument("state_file")
+    sync.add_argument("--concurrency", type=int, default=UPLOAD_CONCURRENCY)
+    sync.add_argument("--dry-run", action="store_true", help="only report what would change")
+    sync.add_argument("--full-refresh", action="store_true", help="re-read the whole options list")
+    return parser
+
+
+def build_workflow(args, browser_pool, reporter):
+    if args.command == "upload" and args.processes != 1:
+        from sharded_upload import ShardedUploadWorkflow
+        return ShardedUploadWorkflow(args.file, browser_pool, args.headless, args.processes or None, args.concurrency,
+                                     reporter, use_http=args.http, resume=args.resume)
+    if args.command == "upload":
+        from workflows import OptionUploadWorkflow
+        return OptionUploadWorkflow(args.file, browser_pool, args.headless, args.concurrency, reporter,
+                                    use_http=args.http, resume=args.resume)
+    if args.command == "group-options":
+        from workflows import GroupOptionsWorkflow
+        options = read_list(args.option, args.options_file)
+        return GroupOptionsWorkflow(args.group, options, browser_pool, args.headless, reporter, batch=args.batch,
+                                    resume=args.resume)
+    if args.command == "product-group":
+        from workflows import ProductGroupWorkflow
+        product_ids = read_list(args.product, args.products_file)
+        return ProductGroupWorkflow(product_ids, args.group, browser_pool, args.headless, reporter,
+                                    resume=args.resume)
+    from state_sync import SyncWorkflow
+    return SyncWorkflow(args.state_file, browser_pool, args.headless, args.concurrency, reporter,
+                        dry_run=args.dry_run, full_refresh=args.full_refresh)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not args.username:
+        print("A username is required (--username or $CHR_USERNAME).", file=sys.stderr)
+        return 2
+    password = args.password or getpass.getpass("Password: ")
+
+    from browser_pool import BrowserPool
+    from rate_limiter import current_rates
+    from step_metrics import get_step_metrics, start_metrics_server
+    metrics = get_step_metrics()
+    if args.metrics_jsonl:
+        metrics.jsonl_path = args.metrics_jsonl
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+
+    reporter = JsonLinesReporter()
+    browser_pool = BrowserPool(args.username, password)
+    try:
+        workflow = build_workflow(args, browser_pool, reporter)
+        browser_pool.engine.run(workflow.run())
+    except Exception as e:
+        reporter.error(f"An error occurred: {str(e)}")
+    finally:
+        browser_pool.close()
+        metrics.close()
+    reporter.emit("metrics", steps=metrics.summary(), rate_limits=current_rates())
+    reporter.emit("finished", errors=reporter.errors)
+    return 1 if reporter.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,2 +1,102 @@
+import os
 
-BASE_URL = ""
+# Both can be pointed elsewhere from the environment, e.g. at the mock back
+# office and a scratch directory for benchmarks.
+BASE_URL = os.environ.get("CHR_BASE_URL", "")
+
+APP_DATA_DIR = os.environ.get("CHR_APP_DATA_DIR", os.path.join(os.path.expanduser("~"), ".chr_option_manager"))
+
+SESSION_CACHE_DIR = os.path.join(APP_DATA_DIR, "sessions")
+SESSION_CACHE_MAX_AGE = 8 * 60 * 60
+# Times an item is replayed after logging in again before it is reported failed.
+SESSION_MAX_REPLAYS = 2
+
+UPLOAD_CONCURRENCY = 4
+# Upper bound on the processes a sharded upload may start, whatever the core count.
+UPLOAD_PROCESS_CAP = 8
+
+HTTP_TIMEOUT = 30
+
+# Resources the automation never looks at. URLs matching RESOURCE_ALLOWLIST are
+# always loaded, whatever their type.
+LEAN_BROWSING = True
+BLOCKED_RESOURCE_TYPES = ("image", "stylesheet", "font", "media")
+BLOCKED_URL_PATTERNS = ("google-analytics.com", "googletagmanager.com", "doubleclick.net", "facebook.net", "hotjar.com")
+RESOURCE_ALLOWLIST = ()
+
+WAIT_TIMEOUT = 30000
+RESULT_MARKER_TIMEOUT = 10000
+
+# Requests per second allowed against BASE_URL, adjusted AIMD-style.
+RATE_LIMIT_INITIAL = 2.0
+RATE_LIMIT_MIN = 0.2
+RATE_LIMIT_MAX = 20.0
+RATE_LIMIT_INCREASE = 0.25
+RATE_LIMIT_DECREASE = 0.5
+RATE_LIMIT_SLOW_RESPONSE = 5.0
+
+# Failed actions are retried with exponential backoff and full jitter when the
+# error looks transient. The circuit opens once CIRCUIT_ERROR_RATE of the last
+# CIRCUIT_WINDOW actions failed, pausing every worker for CIRCUIT_OPEN_SECONDS.
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+RETRY_ERROR_MARKERS = ("Timeout", "net::ERR_", "ECONNRESET", "Connection closed", "Target closed")
+CIRCUIT_WINDOW = 20
+CIRCUIT_MIN_CALLS = 5
+CIRCUIT_ERROR_RATE = 0.5
+CIRCUIT_OPEN_SECONDS = 30.0
+
+GROUP_BATCH_MODE = True
+
+OPTION_CATALOG_PATH = os.path.join(APP_DATA_DIR, "option_catalog.sqlite3")
+# Seconds a write waits for another process (e.g. an upload shard) to commit.
+OPTION_CATALOG_BUSY_TIMEOUT = 30.0
+# Every run reads the listing up to the first page with nothing new; a full
+# crawl, which also drops deleted options, runs once the last one is older
+# than this.
+OPTION_CATALOG_MAX_AGE = 6 * 60 * 60
+CATALOG_REF_HEADERS = ("ref", "réf", "référence", "reference")
+CATALOG_DESCRIPTION_HEADERS = ("description", "option", "nom", "libellé")
+CATALOG_NEXT_PAGE_TEXTS = ("Suivant", "Suivante", "Page suivante", ">", ">>", "»")
+
+GROUP_CACHE_TTL = 30 * 60
+
+JOURNAL_DIR = os.path.join(APP_DATA_DIR, "journals")
+
+READ_BATCH_SIZE = 500
+
+# Upload rows are checked before any of them reaches the browser.
+PREFLIGHT_REQUIRE_REF = False
+PREFLIGHT_CACHE_TTL = 30 * 60
+
+# Seconds from launch until the login window is on screen.
+STARTUP_BUDGET = 1.0
+STARTUP_LOG_PATH = os.path.join(APP_DATA_DIR, "startup_times.jsonl")
+
+# Queued jobs run JOB_WORKERS at a time, and at most JOB_HOST_CONCURRENCY
+# against the same back office.
+JOB_QUEUE_PATH = os.path.join(APP_DATA_DIR, "jobs.sqlite3")
+JOB_WORKERS = 2
+JOB_HOST_CONCURRENCY = 2
+JOB_POLL_INTERVAL = 2.0
+
+# Benchmark runs are appended here, next to the code, so results can be
+# compared across versions.
+BENCHMARK_RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_results.jsonl")
+
+# Per-step timings. METRICS_JSONL_PATH, when set, also logs every step of every
+# item; METRICS_PORT, when set, serves /metrics for Prometheus.
+METRICS_ENABLED = True
+METRICS_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_JSONL_PATH = None
+METRICS_PORT = None
+
+# GUI log views keep the last LOG_VIEW_MAX_LINES messages and refresh every
+# LOG_FLUSH_INTERVAL ms; the full log goes to a rotating file.
+LOG_VIEW_MAX_LINES = 5000
+LOG_FLUSH_INTERVAL = 100
+LOG_FILE_PATH = os.path.join(APP_DATA_DIR, "logs", "automation.log")
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUPS = 5
@@ -0,0 +1,99 @@
+import threading
+import time
+from html.parser import HTMLParser
+
+from config import BASE_URL, GROUP_CACHE_TTL
+
+
+class SelectOptionsParser(HTMLParser):
+    def __init__(self, select_id):
+        super().__init__()
+        self.select_id = select_id
+        self.options = {}
+        self._in_select = False
+        self._value = None
+        self._label = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "select" and attrs.get("id") == self.select_id:
+            self._in_select = True
+        elif tag == "option" and self._in_select:
+            if self._label is not None:
+                self._store()
+            self._value = attrs.get("value") or ""
+            self._label = []
+
+    def handle_endtag(self, tag):
+        if tag == "option" and self._label is not None:
+            self._store()
+        elif tag == "select" and self._in_select:
+            if self._label is not None:
+                self._store()
+            self._in_select = False
+
+    def handle_data(self, data):
+        if self._label is not None:
+            self._label.append(data)
+
+    def _store(self):
+        label = " ".join("".join(self._label).split())
+        if label and self._value:
+            self.options[label] = self._value
+        self._value = self._label = None
+
+
+class OptionGroupDirectory:
+    def __init__(self, base_url=BASE_URL, ttl=GROUP_CACHE_TTL):
+        self.base_url = base_url
+        self.ttl = ttl
+        self._ids = {}
+        self._loaded_at = 0.0
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def is_stale(self):
+        return time.monotonic() - self._loaded_at > self.ttl
+
+    def load_select(self, html):
+        parser = SelectOptionsParser("idOptionGroup")
+        parser.feed(html)
+        with self._lock:
+            self._ids = parser.options
+            self._loaded_at = time.monotonic()
+        return parser.options
+
+    async def group_id(self, group_name, fetch, product_id):
+        # Any product edit page lists every group in its idOptionGroup select.
+        # An unknown name triggers one reload in case the group is new.
+        group_name = " ".join(group_name.split())
+        if self.is_stale() or group_name not in self._ids:
+            self.load_select(await fetch(f"{self.base_url}/SA_prod_edit.asp?action=edit&recid={product_id}"))
+        return self._ids.get(group_name)
+
+    def group_page(self, group_name):
+        with self._lock:
+            url, stored_at = self._pages.get(group_name, (None, 0.0))
+        if url and time.monotonic() - stored_at <= self.ttl:
+            return url
+        return None
+
+    def remember_group_page(self, group_name, url):
+        with self._lock:
+            self._pages[group_name] = (url, time.monotonic())
+
+    def forget_group_page(self, group_name):
+        with self._lock:
+            self._pages.pop(group_name, None)
+
+
+_directories = {}
+_directories_lock = threading.Lock()
+
+
+def get_group_directory(base_url=BASE_URL):
+    with _directories_lock:
+        directory = _directories.get(base_url)
+        if directory is None:
+            directory = _directories[base_url] = OptionGroupDirectory(base_url)
+        return directory
@@ -0,0 +1,127 @@
+from html.parser import HTMLParser
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import BASE_URL, UPLOAD_CONCURRENCY, HTTP_TIMEOUT
+from session_cache import SessionCache
+from session_guard import SessionExpired, body_expired
+
+
+class _HiddenInputParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.fields = {}
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "input" and attrs.get("type", "").lower() == "hidden" and attrs.get("name"):
+            self.fields[attrs["name"]] = attrs.get("value") or ""
+
+
+class HttpOptionTransport:
+    def __init__(self, username, password, base_url=BASE_URL, pool_size=UPLOAD_CONCURRENCY, session_cache=None):
+        self.username = username
+        self.password = password
+        self.base_url = base_url
+        self.session_cache = session_cache or SessionCache(username, password)
+        self.add_option_url = f"{base_url}/SA_opt_edit.asp?action=add"
+        self.hidden_fields = {}
+        self.charset = "utf-8"
+        # Bumped on every login; the submitters share one cookie jar.
+        self.generation = 0
+        self._login_lock = threading.Lock()
+
+        # One keep-alive connection per concurrent submitter.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def login(self):
+        if not (self.restore_session() or self.login_with_form()):
+            return False
+        self.load_form_defaults()
+        self.generation += 1
+        return True
+
+    def renew_session(self, stale):
+        # Only the first submitter to see a generation expire logs in again.
+        with self._login_lock:
+            if self.generation != stale:
+                return self.generation
+            self.session.cookies.clear()
+            self.session_cache.clear()
+            if not self.login_with_form():
+                raise RuntimeError("The session expired and logging in again failed.")
+            self.load_form_defaults()
+            self.generation += 1
+            return self.generation
+
+    def restore_session(self):
+        storage_state = self.session_cache.load()
+        if not storage_state:
+            return False
+
+        for cookie in storage_state.get("cookies", []):
+            self.session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+        if self.is_session_valid():
+            return True
+
+        self.session.cookies.clear()
+        return False
+
+    def is_session_valid(self):
+        # An expired session is redirected to logon.asp; without following
+        # redirects that is a 3xx, which requests counts as ok.
+        response = self.session.get(f"{self.base_url}/options/optionslist.asp", allow_redirects=False, timeout=HTTP_TIMEOUT)
+        return response.status_code == 200 and not response.is_redirect and "adminPass" not in response.text
+
+    def login_with_form(self):
+        response = self.session.post(f"{self.base_url}/logon.asp",
+                                     data={"adminuser": self.username, "adminPass": self.password},
+                                     timeout=HTTP_TIMEOUT)
+        # A server error says nothing about the credentials; let the retry layer have it.
+        if response.status_code >= 500:
+            response.raise_for_status()
+        return response.ok and "© Copyright 2024 - Restoconcept" in response.text
+
+    def load_form_defaults(self):
+        # The add form may carry hidden fields the server expects back; read
+        # them once and replay them with every submission.
+        response = self.session.get(self.add_option_url, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+        self.charset = response.encoding or "utf-8"
+        parser = _HiddenInputParser()
+        parser.feed(response.text)
+        self.hidden_fields = parser.fields
+
+    def fetch_text(self, url):
+        response = self.session.get(url, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+        if body_expired(response.text):
+            raise SessionExpired()
+        return response.text
+
+    def submit_option(self, fields):
+        data = dict(self.hidden_fields)
+        data.update(fields)
+        encoded = {name: value.encode(self.charset, errors="replace") for name, value in data.items()}
+        response = self.session.post(self.add_option_url, data=encoded, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+        return self.parse_submission_result(response.text)
+
+    def parse_submission_result(self, body):
+        if "Option déjà créée" in body:
+            return "Option already exists. Skipping..."
+        elif body_expired(body):
+            raise SessionExpired()
+        elif "Option ajoutée avec succès" in body:
+            return "Option added successfully."
+        else:
+            return "Unexpected result after submission. Check manually."
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,65 @@
+import hashlib
+import json
+import os
+import time
+
+from config import JOURNAL_DIR
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class JobJournal:
+    # Append-only: a fresh run writes a "start" marker, and only outcomes after
+    # the latest marker count when resuming.
+    def __init__(self, kind, job_key, journal_dir=JOURNAL_DIR):
+        self.kind = kind
+        self.job_key = job_key
+        name = hashlib.sha256(f"{kind}:{job_key}".encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(journal_dir, f"{kind}-{name}.jsonl")
+        self._file = None
+
+    def begin(self, resume=False):
+        completed = self.completed() if resume else set()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._write({"event": "resume" if resume else "start", "kind": self.kind, "job": self.job_key})
+        return completed
+
+    def completed(self):
+        completed = set()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A crash can leave a truncated last line.
+                        continue
+                    if record.get("event") == "start":
+                        completed.clear()
+                    elif record.get("status") == "done":
+                        completed.add(record["item"])
+                    elif record.get("status") == "failed":
+                        completed.discard(record["item"])
+        except OSError:
+            pass
+        return completed
+
+    def record(self, item, done, message=""):
+        self._write({"item": item, "status": "done" if done else "failed", "message": message})
+
+    def _write(self, record):
+        record["at"] = time.time()
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,257 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+from config import BASE_URL, JOB_QUEUE_PATH, JOB_WORKERS, JOB_HOST_CONCURRENCY, JOB_POLL_INTERVAL
+from workflows import Reporter
+
+JOB_KINDS = ("upload", "group-options", "product-group", "sync")
+
+
+def build_job_workflow(kind, params, browser_pool, reporter, resume=False):
+    if kind == "upload" and params.get("processes", 1) > 1:
+        from sharded_upload import ShardedUploadWorkflow
+        return ShardedUploadWorkflow(params["file"], browser_pool, params.get("headless", True), params["processes"],
+                                     params.get("concurrency", 1), reporter, use_http=params.get("use_http", False),
+                                     resume=resume or params.get("resume", False))
+    if kind == "upload":
+        from workflows import OptionUploadWorkflow
+        return OptionUploadWorkflow(params["file"], browser_pool, params.get("headless", True),
+                                    params.get("concurrency", 1), reporter, use_http=params.get("use_http", False),
+                                    resume=resume or params.get("resume", False))
+    if kind == "group-options":
+        from workflows import GroupOptionsWorkflow
+        return GroupOptionsWorkflow(params["group"], params["options"], browser_pool, params.get("headless", True),
+                                    reporter, batch=params.get("batch", True),
+                                    resume=resume or params.get("resume", False))
+    if kind == "product-group":
+        from workflows import ProductGroupWorkflow
+        return ProductGroupWorkflow(params["product_ids"], params["group"], browser_pool,
+                                    params.get("headless", True), reporter,
+                                    resume=resume or params.get("resume", False))
+    if kind == "sync":
+        from state_sync import SyncWorkflow
+        return SyncWorkflow(params["state_file"], browser_pool, params.get("headless", True),
+                            params.get("concurrency", 1), reporter, dry_run=params.get("dry_run", False))
+    raise ValueError(f"Unknown job kind '{kind}'.")
+
+
+def describe_job(kind, params):
+    if kind == "upload":
+        return os.path.basename(params["file"])
+    if kind == "group-options":
+        return f"{len(params['options'])} options → {params['group']}"
+    if kind == "product-group":
+        return f"{params['group']} → {len(params['product_ids'])} products"
+    if kind == "sync":
+        return os.path.basename(params["state_file"])
+    return kind
+
+
+class JobQueue:
+    # Shared by the GUI thread, which enqueues and lists, and the scheduler on
+    # the engine loop, which claims and updates.
+    def __init__(self, path=JOB_QUEUE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                params TEXT NOT NULL,
+                host TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                state TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                progress INTEGER NOT NULL DEFAULT 0,
+                message TEXT NOT NULL DEFAULT '',
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (state, priority DESC, id);
+        """)
+        # Jobs left running by a crash go back to the queue; their journals
+        # let them resume where they stopped.
+        with self._lock:
+            self.connection.execute("UPDATE jobs SET state = 'queued' WHERE state = 'running'")
+            self.connection.commit()
+
+    def enqueue(self, kind, params, priority=0, base_url=BASE_URL):
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}'.")
+        host = urlparse(base_url).netloc or base_url
+        with self._lock:
+            cursor = self.connection.execute(
+                "INSERT INTO jobs (kind, params, host, priority, created_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, json.dumps(params, ensure_ascii=False), host, priority, time.time()))
+            self.connection.commit()
+            return cursor.lastrowid
+
+    def claim(self, busy_hosts=()):
+        # Highest priority first, oldest first within a priority, skipping hosts
+        # that already run as many jobs as they are allowed.
+        busy_hosts = list(busy_hosts)
+        placeholders = ", ".join("?" for _ in busy_hosts)
+        host_filter = f"AND host NOT IN ({placeholders})" if busy_hosts else ""
+        with self._lock:
+            row = self.connection.execute(
+                f"SELECT * FROM jobs WHERE state = 'queued' {host_filter} ORDER BY priority DESC, id LIMIT 1",
+                busy_hosts).fetchone()
+            if row is None:
+                return None
+            self.connection.execute(
+                "UPDATE jobs SET state = 'running', attempts = attempts + 1, started_at = ?, progress = 0 "
+                "WHERE id = ?", (time.time(), row["id"]))
+            self.connection.commit()
+            return dict(row)
+
+    def update(self, job_id, progress=None, message=None):
+        with self._lock:
+            if progress is not None:
+                self.connection.execute("UPDATE jobs SET progress = ? WHERE id = ?", (progress, job_id))
+            if message is not None:
+                self.connection.execute("UPDATE jobs SET message = ? WHERE id = ?", (message, job_id))
+            self.connection.commit()
+
+    def finish(self, job_id, state, message=None):
+        with self._lock:
+            self.connection.execute(
+                "UPDATE jobs SET state = ?, finished_at = ?, message = COALESCE(?, message) WHERE id = ?",
+                (state, time.time(), message, job_id))
+            self.connection.commit()
+
+    def set_priority(self, job_id, priority):
+        with self._lock:
+            self.connection.execute("UPDATE jobs SET priority = ? WHERE id = ?", (priority, job_id))
+            self.connection.commit()
+
+    def cancel(self, job_id):
+        with self._lock:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET state = 'cancelled', finished_at = ? WHERE id = ? AND state = 'queued'",
+                (time.time(), job_id))
+            self.connection.commit()
+            return cursor.rowcount > 0
+
+    def clear_finished(self):
+        with self._lock:
+            self.connection.execute("DELETE FROM jobs WHERE state IN ('done', 'failed', 'cancelled')")
+            self.connection.commit()
+
+    def jobs(self, limit=500):
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT * FROM jobs ORDER BY state != 'running', state != 'queued', priority DESC, id LIMIT ?",
+                (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+
+class JobScheduler:
+    def __init__(self, job_queue, browser_pool, max_workers=JOB_WORKERS, per_host=JOB_HOST_CONCURRENCY,
+                 poll_interval=JOB_POLL_INTERVAL):
+        self.job_queue = job_queue
+        self.browser_pool = browser_pool
+        self.max_workers = max(1, max_workers)
+        self.per_host = max(1, per_host)
+        self.poll_interval = poll_interval
+        self._running = {}
+        self._wake = None
+        self._future = None
+
+    def start(self):
+        if self._future is None:
+            self._future = self.browser_pool.engine.submit(self._run())
+
+    def stop(self):
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    async def _run(self):
+        self._wake = asyncio.Event()
+        try:
+            while True:
+                self._fill_slots()
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in list(self._running.values()):
+                task.cancel()
+
+    def _fill_slots(self):
+        while len(self._running) < self.max_workers:
+            per_host = {}
+            for host in self._running_hosts():
+                per_host[host] = per_host.get(host, 0) + 1
+            job = self.job_queue.claim([host for host, count in per_host.items() if count >= self.per_host])
+            if job is None:
+                return
+            task = asyncio.create_task(self._run_job(job))
+            self._running[job["id"]] = (job["host"], task)
+            task.add_done_callback(lambda _, job_id=job["id"]: self._job_done(job_id))
+
+    def _running_hosts(self):
+        return [host for host, _ in self._running.values()]
+
+    def _job_done(self, job_id):
+        self._running.pop(job_id, None)
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run_job(self, job):
+        job_id = job["id"]
+        errors = []
+
+        def error(message):
+            errors.append(message)
+            self.job_queue.update(job_id, message=message)
+
+        reporter = Reporter(progress=lambda value: self.job_queue.update(job_id, progress=value),
+                            status=lambda message: self.job_queue.update(job_id, message=message),
+                            log=lambda message: self.job_queue.update(job_id, message=message),
+                            error=error,
+                            circuit=lambda state, message: self.job_queue.update(job_id, message=message))
+        try:
+            # A job that ran before was interrupted; resume from its journal.
+            workflow = build_job_workflow(job["kind"], json.loads(job["params"]), self.browser_pool, reporter,
+                                          resume=job["attempts"] > 0)
+            await workflow.run()
+        except asyncio.CancelledError:
+            self.job_queue.finish(job_id, "queued", "Interrupted; will resume.")
+            raise
+        except Exception as e:
+            self.job_queue.finish(job_id, "failed", f"An error occurred: {str(e)}")
+            return
+        if errors:
+            self.job_queue.finish(job_id, "failed", f"{len(errors)} errors, last: {errors[-1]}")
+        else:
+            self.job_queue.update(job_id, progress=100)
+            self.job_queue.finish(job_id, "done")
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_job_queue(path=JOB_QUEUE_PATH):
+    with _queues_lock:
+        job_queue = _queues.get(path)
+        if job_queue is None:
+            job_queue = _queues[path] = JobQueue(path)
+        return job_queue
@@ -0,0 +1,97 @@
+import json
+import sys
+from datetime import datetime
+from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget,
+                             QTableWidgetItem, QHeaderView, QAbstractItemView)
+from PyQt5.QtCore import QTimer, QItemSelectionModel
+
+from job_queue import describe_job, get_job_queue
+
+
+class JobQueueGUI(QWidget):
+    COLUMNS = ("ID", "Kind", "Job", "Priority", "State", "Progress", "Last message", "Queued at")
+
+    def __init__(self, job_queue=None):
+        super().__init__()
+        self.job_queue = job_queue or get_job_queue()
+        self.initUI()
+
+        # The scheduler writes straight to the queue; the view just re-reads it.
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(1000)
+        self.refresh()
+
+    def initUI(self):
+        self.setWindowTitle('RestoConcept Job Queue')
+        self.setGeometry(100, 100, 900, 500)
+
+        layout = QVBoxLayout()
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        self.raise_button = QPushButton("Raise priority")
+        self.raise_button.clicked.connect(lambda: self.change_priority(1))
+        buttons.addWidget(self.raise_button)
+
+        self.lower_button = QPushButton("Lower priority")
+        self.lower_button.clicked.connect(lambda: self.change_priority(-1))
+        buttons.addWidget(self.lower_button)
+
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_selected)
+        buttons.addWidget(self.cancel_button)
+
+        self.clear_button = QPushButton("Clear finished")
+        self.clear_button.clicked.connect(self.clear_finished)
+        buttons.addWidget(self.clear_button)
+        layout.addLayout(buttons)
+
+        self.setLayout(layout)
+
+    def refresh(self):
+        selected = set(self.selected_ids())
+        jobs = self.job_queue.jobs()
+        self.jobs = {job["id"]: job for job in jobs}
+        self.table.clearSelection()
+        self.table.setRowCount(len(jobs))
+        for row, job in enumerate(jobs):
+            values = (job["id"], job["kind"], describe_job(job["kind"], json.loads(job["params"])), job["priority"],
+                      job["state"], f"{job['progress']}%", job["message"],
+                      datetime.fromtimestamp(job["created_at"]).strftime("%Y-%m-%d %H:%M"))
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(str(value)))
+            if job["id"] in selected:
+                self.table.selectionModel().select(self.table.model().index(row, 0),
+                                                   QItemSelectionModel.Select | QItemSelectionModel.Rows)
+
+    def selected_ids(self):
+        rows = {index.row() for index in self.table.selectedIndexes()}
+        return [int(self.table.item(row, 0).text()) for row in rows if self.table.item(row, 0)]
+
+    def change_priority(self, step):
+        for job_id in self.selected_ids():
+            self.job_queue.set_priority(job_id, self.jobs[job_id]["priority"] + step)
+        self.refresh()
+
+    def cancel_selected(self):
+        for job_id in self.selected_ids():
+            self.job_queue.cancel(job_id)
+        self.refresh()
+
+    def clear_finished(self):
+        self.job_queue.clear_finished()
+        self.refresh()
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    gui = JobQueueGUI()
+    gui.show()
+    sys.exit(app.exec_())
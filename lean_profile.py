@@ -0,0 +1,24 @@
+from config import BLOCKED_RESOURCE_TYPES, BLOCKED_URL_PATTERNS, RESOURCE_ALLOWLIST
+
+
+class LeanProfile:
+    def __init__(self, blocked_types=BLOCKED_RESOURCE_TYPES, blocked_urls=BLOCKED_URL_PATTERNS,
+                 allowlist=RESOURCE_ALLOWLIST):
+        self.blocked_types = set(blocked_types)
+        self.blocked_urls = tuple(blocked_urls)
+        self.allowlist = tuple(allowlist)
+
+    def should_block(self, resource_type, url):
+        if any(pattern in url for pattern in self.allowlist):
+            return False
+        return resource_type in self.blocked_types or any(pattern in url for pattern in self.blocked_urls)
+
+    async def apply(self, context):
+        await context.route("**/*", self._handle_route)
+
+    async def _handle_route(self, route):
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            await route.abort()
+        else:
+            await route.continue_()
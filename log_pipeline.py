@@ -0,0 +1,89 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from config import LOG_FILE_PATH, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUPS, LOG_VIEW_MAX_LINES
+from workflows import Reporter
+
+LEVELS = {"DEBUG": logging.DEBUG, "INFO": logging.INFO, "WARNING": logging.WARNING, "ERROR": logging.ERROR}
+
+_file_logger = None
+_file_logger_lock = threading.Lock()
+
+
+def get_file_logger(path=LOG_FILE_PATH):
+    global _file_logger
+    with _file_logger_lock:
+        if _file_logger is None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handler = RotatingFileHandler(path, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS,
+                                          encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+            # Callers only enqueue the record; the file is written from the
+            # listener's own thread, never from the engine loop.
+            records = queue.SimpleQueue()
+            listener = QueueListener(records, handler)
+            listener.start()
+            atexit.register(listener.stop)
+            _file_logger = logging.getLogger("chr_option_manager")
+            _file_logger.setLevel(logging.DEBUG)
+            _file_logger.propagate = False
+            _file_logger.addHandler(QueueHandler(records))
+        return _file_logger
+
+
+class LogSink:
+    # Collects a worker's messages without touching Qt: each one goes to the
+    # rotating log file straight away and into a bounded buffer that the log
+    # view drains in batches on a timer. Status and progress keep only their
+    # latest value.
+    def __init__(self, name, log_status=False, max_lines=LOG_VIEW_MAX_LINES):
+        self.name = name
+        self.log_status = log_status
+        self.logger = get_file_logger()
+        self._lines = deque(maxlen=max_lines)
+        self.status = None
+        self.progress = None
+        self.circuit = None
+
+    def log(self, message, level="INFO"):
+        self._lines.append((level, message))
+        self.logger.log(LEVELS[level], "[%s] %s", self.name, message)
+
+    def error(self, message):
+        self.log(message, "ERROR")
+
+    def set_status(self, message):
+        self.status = message
+        if self.log_status:
+            self.log(message)
+        else:
+            self.logger.debug("[%s] %s", self.name, message)
+
+    def set_progress(self, value):
+        self.progress = value
+
+    def set_circuit(self, state, message):
+        self.circuit = (state, message)
+        self.log(message, "INFO" if state == "closed" else "WARNING")
+
+    def drain(self):
+        lines = []
+        while True:
+            try:
+                lines.append(self._lines.popleft())
+            except IndexError:
+                return lines
+
+    def reporter(self, error=None):
+        def on_error(message):
+            self.error(message)
+            if error is not None:
+                error(message)
+
+        return Reporter(progress=self.set_progress, status=self.set_status, log=self.log, error=on_error,
+                        circuit=self.set_circuit)
@@ -0,0 +1,131 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QListView
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSortFilterProxyModel, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor
+
+from config import LOG_VIEW_MAX_LINES, LOG_FLUSH_INTERVAL
+from log_pipeline import LEVELS
+
+LEVEL_ROLE = Qt.UserRole + 1
+LEVEL_COLORS = {"DEBUG": QColor("#888888"), "WARNING": QColor("#b9770e"), "ERROR": QColor("#c0392b")}
+
+
+class LogModel(QAbstractListModel):
+    # A ring buffer of (level, message); the oldest rows go once it is full.
+    def __init__(self, max_lines=LOG_VIEW_MAX_LINES, parent=None):
+        super().__init__(parent)
+        self.max_lines = max_lines
+        self._lines = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._lines)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        level, message = self._lines[index.row()]
+        if role == Qt.DisplayRole:
+            return message
+        if role == Qt.ForegroundRole:
+            return LEVEL_COLORS.get(level)
+        if role == LEVEL_ROLE:
+            return LEVELS[level]
+        return None
+
+    def append_lines(self, lines):
+        lines = lines[-self.max_lines:]
+        overflow = len(self._lines) + len(lines) - self.max_lines
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            del self._lines[:overflow]
+            self.endRemoveRows()
+        self.beginInsertRows(QModelIndex(), len(self._lines), len(self._lines) + len(lines) - 1)
+        self._lines.extend(lines)
+        self.endInsertRows()
+
+
+class LevelFilter(QSortFilterProxyModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.min_level = LEVELS["DEBUG"]
+
+    def set_min_level(self, level):
+        self.min_level = level
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        index = self.sourceModel().index(source_row, 0, source_parent)
+        return self.sourceModel().data(index, LEVEL_ROLE) >= self.min_level
+
+
+class LogView(QWidget):
+    # Drains a LogSink every LOG_FLUSH_INTERVAL ms, so thousands of messages
+    # per second cost one model update per tick instead of one per message.
+    status_changed = pyqtSignal(str)
+    progress_changed = pyqtSignal(int)
+
+    FILTERS = (("All messages", "DEBUG"), ("Info and above", "INFO"), ("Warnings and errors", "WARNING"),
+               ("Errors only", "ERROR"))
+
+    def __init__(self, sink, max_lines=LOG_VIEW_MAX_LINES, interval=LOG_FLUSH_INTERVAL, parent=None):
+        super().__init__(parent)
+        self.sink = sink
+        self.model = LogModel(max_lines, self)
+        self.proxy = LevelFilter(self)
+        self.proxy.setSourceModel(self.model)
+        self._status = None
+        self._progress = None
+        self._circuit = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Show:"))
+        self.level_filter = QComboBox()
+        for label, _ in self.FILTERS:
+            self.level_filter.addItem(label)
+        self.level_filter.currentIndexChanged.connect(
+            lambda index: self.proxy.set_min_level(LEVELS[self.FILTERS[index][1]]))
+        filter_layout.addWidget(self.level_filter)
+        filter_layout.addStretch()
+        # Shown while the retry layer holds the workers back.
+        self.circuit_label = QLabel()
+        self.circuit_label.setStyleSheet("color: #b9770e; font-weight: bold;")
+        self.circuit_label.hide()
+        filter_layout.addWidget(self.circuit_label)
+        layout.addLayout(filter_layout)
+
+        self.list_view = QListView()
+        self.list_view.setModel(self.proxy)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setEditTriggers(QListView.NoEditTriggers)
+        self.list_view.setSelectionMode(QListView.ExtendedSelection)
+        layout.addWidget(self.list_view)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start(interval)
+
+    def append(self, message, level="INFO"):
+        self.sink.log(message, level)
+
+    def flush(self):
+        lines = self.sink.drain()
+        if lines:
+            scrollbar = self.list_view.verticalScrollBar()
+            at_bottom = scrollbar.value() >= scrollbar.maximum()
+            self.model.append_lines(lines)
+            if at_bottom:
+                self.list_view.scrollToBottom()
+        status, progress = self.sink.status, self.sink.progress
+        if status is not None and status != self._status:
+            self._status = status
+            self.status_changed.emit(status)
+        if progress is not None and progress != self._progress:
+            self._progress = progress
+            self.progress_changed.emit(progress)
+        circuit = self.sink.circuit
+        if circuit is not None and circuit != self._circuit:
+            self._circuit = circuit
+            state, message = circuit
+            self.circuit_label.setText(message)
+            self.circuit_label.setVisible(state != "closed")
@@ -1,26 +1,67 @@
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+import asyncio
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from config import BASE_URL
+from retry_policy import raise_for_status
+from session_cache import SessionCache
 
 
 class LoginManager:
     LOGIN_URL = f"{BASE_URL}/logon.asp"
+    SESSION_CHECK_URL = f"{BASE_URL}/options/optionslist.asp"
 
-    def __init__(self, username, password):
+    def __init__(self, username, password, session_cache=None):
         self.username = username
         self.password = password
+        self.session_cache = session_cache or SessionCache(username, password)
+
+    async def login(self, page):
+        if await self.restore_session(page):
+            return True
+
+        # Only a login page that answered and did not let us in means bad
+        # credentials; server and network errors are raised for the retry layer.
+        raise_for_status(await page.goto(self.LOGIN_URL))
+        await page.fill("#adminuser", self.username)
+        await page.fill("#adminPass", self.password)
+        async with page.expect_navigation() as navigation:
+            await page.click("#btn1")
+        raise_for_status(await navigation.value)
+
+        try:
+            await page.wait_for_selector('td[align="center"][style="background-color:#eeeeee"]:has-text("© Copyright 2024 - Restoconcept")', timeout=5000)
+        except PlaywrightTimeoutError:
+            return False
 
-    def login(self, page):
         try:
-            page.goto(self.LOGIN_URL)
-            page.fill("#adminuser", self.username)
-            page.fill("#adminPass", self.password)
-            page.click("#btn1")
-            
-            try:
-                page.wait_for_selector('td[align="center"][style="background-color:#eeeeee"]:has-text("© Copyright 2024 - Restoconcept")', timeout=5000)
+            storage_state = await page.context.storage_state()
+            await asyncio.to_thread(self.session_cache.save, storage_state)
+        except Exception:
+            pass
+        return True
+
+    async def restore_session(self, page):
+        # Key derivation is deliberately slow, keep it off the engine loop.
+        storage_state = await asyncio.to_thread(self.session_cache.load)
+        if not storage_state:
+            return False
+
+        try:
+            await page.context.add_cookies(storage_state.get("cookies", []))
+            if await self.is_session_valid(page):
                 return True
-            except PlaywrightTimeoutError:
-                return False
-        except Exception as e:
+        except Exception:
+            pass
+
+        await page.context.clear_cookies()
+        self.session_cache.clear()
+        return False
+
+    async def is_session_valid(self, page):
+        # An expired session is redirected to logon.asp, so one request without
+        # following redirects is enough to tell.
+        response = await page.request.get(self.SESSION_CHECK_URL, max_redirects=0)
+        if not response.ok:
             return False
+        return "adminPass" not in await response.text()
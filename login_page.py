@@ -1,12 +1,14 @@
 
 
 import sys
+import time
+STARTED_AT = time.perf_counter()
+
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QTextEdit, QFrame, QCheckBox, QProgressBar
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
-from login_handler import LoginManager
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 
-from main_page import MainPage
+# Playwright (via browser_pool) and the main page are imported on first use so
+# the login window opens without them; startup_budget.py keeps this honest.
 
 class LoginWorker(QThread):
 
@@ -23,23 +25,20 @@ class LoginWorker(QThread):
         self.login_success = False
 
     def run(self):
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=self.headless)
-            page = browser.new_page()
-
-            try:
-                login_manager = LoginManager(self.username, self.password)
-                if not login_manager.login(page):
-                    self.error_occurred.emit("Login failed. Please check your username and password.")
-                    return
-                self.login_success = True
-                self.login_successful.emit(True)  # Emit success signal on successful login
-            except Exception as e:
-                self.log_update.emit(f"An error occurred: {str(e)}")
-                self.login_successful.emit(False)
-            finally:
-                browser.close()
-                self.finished.emit()
+        # The pool that validates the credentials is handed to MainPage, so the
+        # tools start from this login instead of doing their own.
+        from browser_pool import BrowserPool
+        self.browser_pool = BrowserPool(self.username, self.password)
+        try:
+            self.browser_pool.engine.run(self.browser_pool.start(self.headless))
+            self.login_success = True
+            self.login_successful.emit(True)  # Emit success signal on successful login
+        except Exception as e:
+            self.browser_pool.close()
+            self.log_update.emit(f"An error occurred: {str(e)}")
+            self.login_successful.emit(False)
+        finally:
+            self.finished.emit()
 
 
 class MainWindow(QMainWindow):
@@ -140,9 +139,11 @@ class MainWindow(QMainWindow):
         
         # Hide the login window and show the main page
             self.hide()  # Hide login window
+            from main_page import MainPage
             self.main_page = MainPage(
                 self.username_input.text(),
-                self.password_input.text())  # Pass username and password
+                self.password_input.text(),
+                self.login_worker.browser_pool)  # Pass username, password and the logged-in pool
         # Create main page
             self.main_page.show()  # Show main page
         else:
@@ -209,7 +210,10 @@ class MainWindow(QMainWindow):
         self.title_label.setStyleSheet("font-size: 24px; font-weight: bold; color: #3498db; margin-bottom: 20px;")
 
 if __name__ == "__main__":
+    from startup_budget import record_startup
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
+    # Fires once the event loop has painted the window.
+    QTimer.singleShot(0, lambda: record_startup(STARTED_AT))
     sys.exit(app.exec_())
\ No newline at end of file
@@ -1,15 +1,29 @@
 from PyQt5.QtWidgets import QVBoxLayout, QLabel, QPushButton, QWidget, QMainWindow
-from add_group_to_product import Add_Group_to_ProductGUI
-from option_uploader import OptionsUploaderGUI
-from add_options_to_group import RestoConcept_Option_ManagerGUI
 
+# The tool windows, and pandas and Playwright behind them, are imported when
+# first opened so the main page shows straight after login.
 
 
 class MainPage(QWidget):
-    def __init__(self, username, password):
+    def __init__(self, username, password, browser_pool=None):
         super().__init__()
         self.username = username
         self.password = password
+        if browser_pool is None:
+            from browser_pool import BrowserPool
+            browser_pool = BrowserPool(username, password)
+        self.browser_pool = browser_pool
+        self.browser_pool.warm_up()
+
+        # Jobs queued from the tool windows run here, in the background.
+        from job_queue import JobScheduler, get_job_queue
+        self.scheduler = JobScheduler(get_job_queue(), self.browser_pool)
+        self.scheduler.start()
+
+        from config import METRICS_PORT
+        if METRICS_PORT:
+            from step_metrics import start_metrics_server
+            self.metrics_server = start_metrics_server(METRICS_PORT)
         self.setWindowTitle("Main Page")
         self.setGeometry(100, 100, 600, 600)
 
@@ -34,15 +48,41 @@ class MainPage(QWidget):
         self.add_group_button.clicked.connect(self.open_add_group)
         main_layout.addWidget(self.add_group_button)
 
+        self.sync_button = QPushButton("Go to Catalog Sync")
+        self.sync_button.clicked.connect(self.open_sync)
+        main_layout.addWidget(self.sync_button)
+
+        self.job_queue_button = QPushButton("Go to Job Queue")
+        self.job_queue_button.clicked.connect(self.open_job_queue)
+        main_layout.addWidget(self.job_queue_button)
+
     def open_options_uploader(self):
-        self.options_uploader_page = OptionsUploaderGUI(self.username, self.password)
+        from option_uploader import OptionsUploaderGUI
+        self.options_uploader_page = OptionsUploaderGUI(self.username, self.password, self.browser_pool)
         self.options_uploader_page.show()
 
     def open_option_manager(self):
-        self.option_manager_page = RestoConcept_Option_ManagerGUI(self.username, self.password)
+        from add_options_to_group import RestoConcept_Option_ManagerGUI
+        self.option_manager_page = RestoConcept_Option_ManagerGUI(self.username, self.password, self.browser_pool)
         self.option_manager_page.show()
 
     def open_add_group(self):
-        self.add_group_page = Add_Group_to_ProductGUI(self.username, self.password)
+        from add_group_to_product import Add_Group_to_ProductGUI
+        self.add_group_page = Add_Group_to_ProductGUI(self.username, self.password, self.browser_pool)
         self.add_group_page.show()
 
+    def open_sync(self):
+        from sync_page import SyncGUI
+        self.sync_page = SyncGUI(self.username, self.password, self.browser_pool)
+        self.sync_page.show()
+
+    def open_job_queue(self):
+        from job_queue_page import JobQueueGUI
+        self.job_queue_page = JobQueueGUI()
+        self.job_queue_page.show()
+
+    def closeEvent(self, event):
+        self.scheduler.stop()
+        self.browser_pool.close()
+        super().closeEvent(event)
+
@@ -0,0 +1,298 @@
+import argparse
+import html
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+# A local stand-in for the RestoConcept back office, close enough to its pages
+# for every workflow to run against it. It only knows the markup the workflows
+# look for; the real admin shows a lot more.
+
+PAGE_SIZE = 50
+COPYRIGHT = '<td align="center" style="background-color:#eeeeee">© Copyright 2024 - Restoconcept</td>'
+DELAIS = {"1": "24h", "2": "48h", "3": "1 semaine"}
+
+
+class BackOfficeState:
+    def __init__(self, groups=10, products=200, options=0):
+        self.lock = threading.Lock()
+        self.sessions = set()
+        self.options = {}
+        self.next_recid = 1
+        self.groups = {str(i): {"name": f"Groupe {i}", "members": set()} for i in range(1, groups + 1)}
+        self.products = {str(1000 + i): set() for i in range(products)}
+        for i in range(options):
+            self.add_option(f"SEED{i:05d}", f"Option existante {i}", "1", "1", "1")
+        self.requests = 0
+
+    def add_option(self, ref, description, price, public_price, delai):
+        key = (ref.strip(), " ".join(description.split()).casefold())
+        if key in self.options:
+            return False
+        self.options[key] = {"recid": str(self.next_recid), "ref": ref.strip(), "description": description.strip(),
+                             "price": price, "public_price": public_price, "delai": delai}
+        self.next_recid += 1
+        return True
+
+    def newest_first(self):
+        return sorted(self.options.values(), key=lambda option: -int(option["recid"]))
+
+    def option_by_recid(self, recid):
+        for option in self.options.values():
+            if option["recid"] == recid:
+                return option
+        return None
+
+
+def page(body, title="RestoConcept"):
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title></head><body>{body}'
+            f'<table><tr>{COPYRIGHT}</tr></table></body></html>')
+
+
+def login_form():
+    return ('<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>'
+            '<form method="post" action="/logon.asp">'
+            '<input id="adminuser" name="adminuser"><input id="adminPass" name="adminPass" type="password">'
+            '<button id="btn1" type="submit">Connexion</button></form></body></html>')
+
+
+def add_option_form(message=""):
+    delais = "".join(f'<option value="{value}">{label}</option>' for value, label in DELAIS.items())
+    return page(f'<p>{message}</p>'
+                '<form method="post" action="/SA_opt_edit.asp?action=add">'
+                '<input type="hidden" name="token" value="mock">'
+                '<input id="optionDescrip" name="optionDescrip" value="">'
+                '<input id="ref" name="ref" value="">'
+                '<input id="pricetoadd" name="pricetoadd" value="">'
+                '<input id="prixpublic" name="prixpublic" value="">'
+                f'<select id="iddelai" name="iddelai">{delais}</select>'
+                '<button type="submit">Ajouter</button></form>')
+
+
+class MockBackOfficeHandler(BaseHTTPRequestHandler):
+    # Set on the subclass built by make_server.
+    state = None
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+    expire_rate = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def handle_request(self, method):
+        url = urlparse(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query, keep_blank_values=True).items()}
+        form = {}
+        if method == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length).decode("utf-8", errors="replace")
+            form = parse_qs(body, keep_blank_values=True)
+
+        with self.state.lock:
+            self.state.requests += 1
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            self.respond("<html><body>Internal Server Error</body></html>", status=500)
+            return
+
+        path = url.path.lower()
+        if path == "/logon.asp":
+            self.handle_logon(method, form)
+            return
+        if not self.logged_in():
+            # Like the real admin: pages redirect to the login page, posts get the form.
+            if method == "GET":
+                self.respond("<html><body><h1>Object moved</h1></body></html>", status=302,
+                             headers=[("Location", "/logon.asp")])
+            else:
+                self.respond(login_form())
+            return
+
+        if path == "/options/optionslist.asp":
+            self.respond(self.options_list(query))
+        elif path == "/sa_opt_edit.asp":
+            self.handle_add_option(method, form)
+        elif path == "/options/optionsgroupslist.asp":
+            self.respond(self.groups_list(query))
+        elif path == "/options/optionsgroupedit.asp":
+            self.handle_group(method, query, form)
+        elif path == "/sa_prod_edit.asp":
+            self.handle_product(method, query, form)
+        else:
+            self.respond(page("<p>Page introuvable</p>"), status=404)
+
+    def respond(self, body, status=200, headers=()):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def logged_in(self):
+        for part in (self.headers.get("Cookie") or "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "MOCKSESSION" and value in self.state.sessions:
+                return True
+        return False
+
+    def handle_logon(self, method, form):
+        if method == "GET":
+            self.respond(login_form())
+            return
+        if not form.get("adminuser", [""])[0] or not form.get("adminPass", [""])[0]:
+            self.respond(login_form())
+            return
+        token = secrets.token_hex(16)
+        with self.state.lock:
+            self.state.sessions.add(token)
+        self.respond(page("<p>Bienvenue</p>"), headers=[("Set-Cookie", f"MOCKSESSION={token}; Path=/")])
+
+    def options_list(self, query):
+        page_number = max(1, int(query.get("page") or 1))
+        with self.state.lock:
+            options = self.state.newest_first()
+        shown = options[(page_number - 1) * PAGE_SIZE:page_number * PAGE_SIZE]
+        rows = "".join(f'<tr><td><a href="/SA_opt_edit.asp?action=edit&recid={option["recid"]}">'
+                       f'{option["recid"]}</a></td><td>{html.escape(option["ref"])}</td>'
+                       f'<td>{html.escape(option["description"])}</td></tr>' for option in shown)
+        next_link = ""
+        if page_number * PAGE_SIZE < len(options):
+            next_link = f'<a href="/options/optionslist.asp?page={page_number + 1}">Suivant</a>'
+        return page(f'<table><tr><th>ID</th><th>Ref</th><th>Description</th></tr>{rows}</table>{next_link}')
+
+    def handle_add_option(self, method, form):
+        if method == "GET":
+            self.respond(add_option_form())
+            return
+        if self.expire_rate and random.random() < self.expire_rate:
+            self.respond(page("<p>Session expirée</p>"))
+            return
+        values = {name: form.get(name, [""])[0] for name in ("optionDescrip", "ref", "pricetoadd", "prixpublic",
+                                                             "iddelai")}
+        with self.state.lock:
+            added = self.state.add_option(values["ref"], values["optionDescrip"], values["pricetoadd"],
+                                          values["prixpublic"], values["iddelai"])
+        self.respond(add_option_form("Option ajoutée avec succès" if added else "Option déjà créée"))
+
+    def groups_list(self, query):
+        search = (query.get("psearch") or "").casefold()
+        with self.state.lock:
+            groups = [(group_id, group["name"]) for group_id, group in self.state.groups.items()
+                      if search in group["name"].casefold()]
+        rows = "".join(f'<tr><td>{html.escape(name)}</td><td><a href="/options/optionsgroupedit.asp?idgroup={group_id}">'
+                       f'<img alt=" Ajouter/retirer des options " src="/img/edit.gif" width="16" height="16"></a></td></tr>'
+                       for group_id, name in groups) if search else ""
+        return page('<form method="get" action="/options/optionsgroupslist.asp">'
+                    f'<input id="psearch" name="psearch" value="{html.escape(search)}">'
+                    f'<button type="submit">Rechercher</button></form><table>{rows}</table>')
+
+    def handle_group(self, method, query, form):
+        group_id = query.get("idgroup") or form.get("idgroup", [""])[0]
+        group = self.state.groups.get(group_id)
+        if group is None:
+            self.respond(page("<p>Groupe introuvable</p>"), status=404)
+            return
+        search = query.get("rch", "")
+        if method == "POST":
+            search = form.get("rch", [""])[0]
+            shown = set(form.get("shown", [""])[0].split(",")) - {""}
+            checked = {values[0] for name, values in form.items() if name.startswith("inclure")}
+            with self.state.lock:
+                group["members"] = (group["members"] - shown) | checked
+        self.respond(self.group_page(group_id, group, search))
+
+    def group_page(self, group_id, group, search):
+        needle = search.casefold()
+        with self.state.lock:
+            options = [option for option in self.state.newest_first()
+                       if needle in option["description"].casefold() or needle in option["ref"].casefold()]
+            members = set(group["members"])
+        rows = "".join(f'<tr><td><input type="checkbox" name="inclure{index}" value="{option["recid"]}"'
+                       f'{" checked" if option["recid"] in members else ""}></td>'
+                       f'<td>{html.escape(option["description"])}</td><td>{html.escape(option["ref"])}</td></tr>'
+                       for index, option in enumerate(options))
+        shown = ",".join(option["recid"] for option in options)
+        return page(f'<h1>{html.escape(group["name"])}</h1>'
+                    f'<form method="get" action="/options/optionsgroupedit.asp">'
+                    f'<input type="hidden" name="idgroup" value="{group_id}">'
+                    f'<input name="rch" value="{html.escape(search)}"><button type="submit">Rechercher</button></form>'
+                    f'<form method="post" action="/options/optionsgroupedit.asp?idgroup={group_id}">'
+                    f'<input type="hidden" name="idgroup" value="{group_id}">'
+                    f'<input type="hidden" name="rch" value="{html.escape(search)}">'
+                    f'<input type="hidden" name="shown" value="{shown}">'
+                    f'<table>{rows}</table><button type="submit">Mettre à jour</button></form>')
+
+    def handle_product(self, method, query, form):
+        product_id = query.get("recid", "")
+        if product_id not in self.state.products:
+            self.respond(page("<p>Produit introuvable</p>"), status=404)
+            return
+        if method == "POST":
+            group_id = form.get("idOptionGroup", [""])[0]
+            if group_id in self.state.groups:
+                with self.state.lock:
+                    self.state.products[product_id].add(group_id)
+        with self.state.lock:
+            assigned = [self.state.groups[group_id]["name"] for group_id in sorted(self.state.products[product_id])]
+            choices = [(group_id, group["name"]) for group_id, group in self.state.groups.items()]
+        assigned_rows = "".join(f"<tr><td>{html.escape(name)}</td></tr>" for name in assigned)
+        select = "".join(f'<option value="{group_id}">{html.escape(name)}</option>' for group_id, name in choices)
+        action = f"/SA_prod_edit.asp?{urlencode({'action': 'edit', 'recid': product_id})}"
+        self.respond(page(f'<h1>Produit {product_id}</h1><table>{assigned_rows}</table>'
+                          f'<form method="post" action="{action}">'
+                          f'<select id="idOptionGroup" name="idOptionGroup">{select}</select>'
+                          f'<button type="submit">Ajouter</button></form>'
+                          f'<form method="post" action="{action}&amp;supplier=1">'
+                          f'<button type="submit">Ajouter le fournisseur</button></form>'))
+
+
+def make_server(state=None, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0, expire_rate=0.0):
+    handler = type("Handler", (MockBackOfficeHandler,), {
+        "state": state or BackOfficeState(), "latency": latency, "jitter": jitter,
+        "error_rate": error_rate, "expire_rate": expire_rate,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+    server.state = handler.state
+    return server
+
+
+def start_server(**settings):
+    server = make_server(**settings)
+    threading.Thread(target=server.serve_forever, name="mock-backoffice", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a mock RestoConcept back office.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 500")
+    parser.add_argument("--expire-rate", type=float, default=0.0, help="share of submissions answered 'Session expirée'")
+    parser.add_argument("--groups", type=int, default=10)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--options", type=int, default=0, help="options that already exist")
+    args = parser.parse_args()
+
+    server = make_server(BackOfficeState(args.groups, args.products, args.options), port=args.port,
+                         latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                         expire_rate=args.expire_rate)
+    print(f"Mock back office on {server.base_url} (set CHR_BASE_URL to use it)")
+    server.serve_forever()
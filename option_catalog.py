@@ -0,0 +1,171 @@
+import os
+import re
+import sqlite3
+import time
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from config import (BASE_URL, OPTION_CATALOG_PATH, OPTION_CATALOG_MAX_AGE, OPTION_CATALOG_BUSY_TIMEOUT,
+                    CATALOG_REF_HEADERS, CATALOG_DESCRIPTION_HEADERS, CATALOG_NEXT_PAGE_TEXTS)
+
+
+class _ListingParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self.links = []
+        self._row = None
+        self._cell = None
+        self._link = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "tr":
+            self._row = {"cells": [], "links": []}
+            self.rows.append(self._row)
+        elif tag in ("td", "th") and self._row is not None:
+            self._cell = []
+        elif tag == "a":
+            self._link = [attrs.get("href") or "", []]
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._row is not None and self._cell is not None:
+            self._row["cells"].append(" ".join("".join(self._cell).split()))
+            self._cell = None
+        elif tag == "tr":
+            self._row = None
+        elif tag == "a" and self._link is not None:
+            href, text = self._link
+            self.links.append((" ".join("".join(text).split()), href))
+            if self._row is not None:
+                self._row["links"].append(href)
+            self._link = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+        if self._link is not None:
+            self._link[1].append(data)
+
+
+def _column(cells, headers):
+    for index, cell in enumerate(cells):
+        if cell.casefold() in headers:
+            return index
+    return None
+
+
+def parse_options_listing(html):
+    parser = _ListingParser()
+    parser.feed(html)
+
+    entries = []
+    ref_col = description_col = None
+    for row in parser.rows:
+        cells = row["cells"]
+        if ref_col is None or description_col is None:
+            ref_col = _column(cells, CATALOG_REF_HEADERS)
+            description_col = _column(cells, CATALOG_DESCRIPTION_HEADERS)
+            continue
+        if len(cells) <= max(ref_col, description_col):
+            continue
+        recid = None
+        for href in row["links"]:
+            match = re.search(r"recid=(\d+)", href)
+            if match:
+                recid = match.group(1)
+                break
+        entries.append((recid, cells[ref_col], cells[description_col]))
+
+    next_url = None
+    for text, href in parser.links:
+        if text in CATALOG_NEXT_PAGE_TEXTS and href:
+            next_url = href
+            break
+    return entries, next_url
+
+
+class OptionCatalog:
+    LISTING_URL = f"{BASE_URL}/options/optionslist.asp"
+
+    def __init__(self, path=OPTION_CATALOG_PATH, max_age=OPTION_CATALOG_MAX_AGE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_age = max_age
+        # Upload shards write to the same file row by row.
+        self.connection = sqlite3.connect(path, timeout=OPTION_CATALOG_BUSY_TIMEOUT)
+        self.connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS options (
+                recid TEXT,
+                ref TEXT NOT NULL,
+                description TEXT NOT NULL,
+                description_key TEXT NOT NULL,
+                PRIMARY KEY (ref, description_key)
+            );
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self._keys = {(ref, key) for ref, key in self.connection.execute("SELECT ref, description_key FROM options")}
+
+    @staticmethod
+    def key(ref, description):
+        return (ref.strip(), " ".join(description.split()).casefold())
+
+    def contains(self, ref, description):
+        return self.key(ref, description) in self._keys
+
+    def add(self, ref, description, recid=None, commit=True):
+        key = self.key(ref, description)
+        if key in self._keys:
+            return False
+        self.connection.execute("INSERT OR IGNORE INTO options VALUES (?, ?, ?, ?)",
+                                (recid, key[0], description.strip(), key[1]))
+        if commit:
+            self.connection.commit()
+        self._keys.add(key)
+        return True
+
+    def last_full_refresh(self):
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'last_full_refresh'").fetchone()
+        return float(row[0]) if row else 0.0
+
+    def is_stale(self):
+        return time.time() - self.last_full_refresh() > self.max_age
+
+    async def refresh(self, fetch, full=False):
+        # The listing shows the newest options first, so a routine refresh
+        # stops at the first page that holds nothing new. Options deleted in
+        # the back office are only noticed by a full crawl, which runs when
+        # asked for or once the last one is older than max_age.
+        full = full or self.is_stale()
+        added = 0
+        seen = set()
+        complete = False
+        url = self.LISTING_URL
+        visited = set()
+        while url and url not in visited:
+            visited.add(url)
+            entries, next_url = parse_options_listing(await fetch(url))
+            new_on_page = 0
+            for recid, ref, description in entries:
+                seen.add(self.key(ref, description))
+                if self.add(ref, description, recid, commit=False):
+                    new_on_page += 1
+            added += new_on_page
+            if not full and entries and not new_on_page:
+                break
+            # Only a readable last page proves the whole listing was seen.
+            complete = bool(entries) and not next_url
+            url = urljoin(url, next_url) if next_url else None
+
+        if full and complete:
+            gone = self._keys - seen
+            self.connection.executemany("DELETE FROM options WHERE ref = ? AND description_key = ?", gone)
+            self._keys -= gone
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('last_full_refresh', ?)",
+                                    (str(time.time()),))
+        self.connection.commit()
+        return added
+
+    def close(self):
+        self.connection.close()
@@ -1,107 +1,55 @@
 
 
 import sys
-import pandas as pd
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, 
-                             QLineEdit, QFileDialog, QProgressBar, QCheckBox, QFrame, QMessageBox, QTextEdit)
+                             QLineEdit, QFileDialog, QProgressBar, QCheckBox, QFrame, QMessageBox,
+                             QSpinBox)
 from PyQt5.QtGui import QIcon, QFont, QColor, QPalette
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 
-from login_handler import LoginManager
-from config import BASE_URL
+from browser_pool import BrowserPool
+from config import UPLOAD_CONCURRENCY, UPLOAD_PROCESS_CAP
+from job_queue import get_job_queue
+from log_pipeline import LogSink
+from log_view import LogView
+from workflows import OptionUploadWorkflow
 
 
 class OptionsUploaderThread(QThread):
-    progress_update = pyqtSignal(int)
-    status_update = pyqtSignal(str)
     error_occurred = pyqtSignal(str)
-    log_update = pyqtSignal(str)
 
-    def __init__(self, excel_file, username, password, headless):
+    def __init__(self, excel_file, username, password, headless, browser_pool, log_sink,
+                 concurrency=UPLOAD_CONCURRENCY, use_http=False, resume=False, processes=1):
         super().__init__()
         self.excel_file = excel_file
         self.username = username
         self.password = password
         self.headless = headless
+        self.browser_pool = browser_pool
+        self.log_sink = log_sink
+        self.concurrency = max(1, concurrency)
+        self.use_http = use_http
+        self.resume = resume
+        self.processes = processes
 
     def run(self):
-        try:
-            options_df = pd.read_excel(self.excel_file)
-            total_rows = len(options_df)
-
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=self.headless)
-                context = browser.new_context()
-                page = context.new_page()
-
-                self.log_update.emit("Starting the upload process...")
-                login_manager = LoginManager(self.username, self.password)
-                if not login_manager.login(page):
-                    self.error_occurred.emit("Login failed. Please check your username and password.")
-                    return 
-
-                for index, row in options_df.iterrows():
-                    self.status_update.emit(f"Processing option {index + 1} of {total_rows}")
-                    self.log_update.emit(f"Processing option {index + 1} of {total_rows}")
-
-                    try:
-                        self.navigate_to_options_page(page)
-                        self.fill_option_form(page, row)
-                        self.submit_option(page)
-                        self.handle_submission_result(page)
-                    except Exception as e:
-                        self.log_update.emit(f"Error processing option {index + 1}: {str(e)}")
-                        continue
-
-                    progress = int((index + 1) / total_rows * 100)
-                    self.progress_update.emit(progress)
-
-        except Exception as e:
-            self.error_occurred.emit(f"An error occurred: {str(e)}")
-            self.log_update.emit(f"Critical error: {str(e)}")
-
-        self.status_update.emit("Upload process completed.")
-        self.log_update.emit("Upload process completed. Check the log for details.")
-
-    
-    def navigate_to_options_page(self, page):
-        page.goto(f"{BASE_URL}/options/optionslist.asp")
-        page.click('a[href="/admin/SA_opt_edit.asp?action=add"]')
-
-    def fill_option_form(self, page, row):
-        optionDescrip = str(row['optionDescrip']) if pd.notna(row['optionDescrip']) else ''
-        ref = str(row['ref']) if pd.notna(row['ref']) else ''
-        pricetoadd = str(row['pricetoadd']) if pd.notna(row['pricetoadd']) else ''
-        prixpublic = str(row['prixpublic']) if pd.notna(row['prixpublic']) else ''
-        iddelai = str(row['iddelai']) if pd.notna(row['iddelai']) else ''
-
-        page.fill("#optionDescrip", optionDescrip)
-        page.fill("#ref", ref)
-        page.fill("#pricetoadd", pricetoadd)
-        page.fill("#prixpublic", prixpublic)
-        page.select_option("#iddelai", iddelai)
-
-    def submit_option(self, page):
-        page.click('button:has-text("Ajouter")')
-        page.wait_for_load_state("networkidle")
-
-    def handle_submission_result(self, page):
-        if page.query_selector('text="Option déjà créée"'):
-            self.log_update.emit("Option already exists. Skipping...")
-        elif page.query_selector('text="Session expirée"'):
-            self.log_update.emit("Session expired. Logging in again...")
-            self.login(page)
-        elif page.query_selector('text="Option ajoutée avec succès"'):
-            self.log_update.emit("Option added successfully.")
+        # Log lines, status and progress go through the sink, not per-message signals.
+        reporter = self.log_sink.reporter(error=self.error_occurred.emit)
+        if self.processes > 1:
+            from sharded_upload import ShardedUploadWorkflow
+            workflow = ShardedUploadWorkflow(self.excel_file, self.browser_pool, self.headless, self.processes,
+                                             self.concurrency, reporter, use_http=self.use_http, resume=self.resume)
         else:
-            self.log_update.emit("Unexpected result after submission. Check manually.")
+            workflow = OptionUploadWorkflow(self.excel_file, self.browser_pool, self.headless, self.concurrency,
+                                            reporter, use_http=self.use_http, resume=self.resume)
+        self.browser_pool.engine.run(workflow.run())
 
 class OptionsUploaderGUI(QWidget):
-    def __init__(self, username, password):
+    def __init__(self, username, password, browser_pool=None):
         super().__init__()
         self.username = username
         self.password = password
+        self.browser_pool = browser_pool or BrowserPool(username, password)
         self.initUI()
         self.apply_styles()
 
@@ -126,19 +74,44 @@ class OptionsUploaderGUI(QWidget):
         self.headless_checkbox.setChecked(True)
         layout.addWidget(self.headless_checkbox)
 
+        self.http_checkbox = QCheckBox("Submit forms directly over HTTP (no browser)")
+        layout.addWidget(self.http_checkbox)
+
+        self.resume_checkbox = QCheckBox("Resume previous run (skip rows already processed)")
+        layout.addWidget(self.resume_checkbox)
+
+        concurrency_layout = QHBoxLayout()
+        concurrency_layout.addWidget(QLabel("Parallel pages:"))
+        self.concurrency_input = QSpinBox()
+        self.concurrency_input.setRange(1, 16)
+        self.concurrency_input.setValue(UPLOAD_CONCURRENCY)
+        concurrency_layout.addWidget(self.concurrency_input)
+        concurrency_layout.addWidget(QLabel("Processes:"))
+        self.processes_input = QSpinBox()
+        self.processes_input.setRange(1, UPLOAD_PROCESS_CAP)
+        self.processes_input.setValue(1)
+        concurrency_layout.addWidget(self.processes_input)
+        layout.addLayout(concurrency_layout)
+
         self.upload_button = QPushButton("Upload Options")
         self.upload_button.clicked.connect(self.start_upload)
         layout.addWidget(self.upload_button)
 
+        self.queue_button = QPushButton("Add to Queue")
+        self.queue_button.clicked.connect(self.queue_upload)
+        layout.addWidget(self.queue_button)
+
         self.progress_bar = QProgressBar()
         layout.addWidget(self.progress_bar)
 
         self.status_label = QLabel("")
         layout.addWidget(self.status_label)
 
-        self.log_textarea = QTextEdit()
-        self.log_textarea.setReadOnly(True)
-        layout.addWidget(self.log_textarea)
+        self.log_sink = LogSink("uploader")
+        self.log_view = LogView(self.log_sink)
+        self.log_view.status_changed.connect(self.status_label.setText)
+        self.log_view.progress_changed.connect(self.progress_bar.setValue)
+        layout.addWidget(self.log_view)
 
         self.setLayout(layout)
 
@@ -149,25 +122,48 @@ class OptionsUploaderGUI(QWidget):
         QApplication.setPalette(palette)
 
     def browse_file(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Select Excel File", "", "Excel Files (*.xls *.xlsx)")
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select Excel File", "",
+                                                   "Spreadsheets (*.xlsx *.xlsm *.xls *.csv *.parquet)")
         if file_path:
             self.file_input.setText(file_path)
 
     def start_upload(self):
         excel_file = self.file_input.text()
         headless = self.headless_checkbox.isChecked()
+        concurrency = self.concurrency_input.value()
+        use_http = self.http_checkbox.isChecked()
+        resume = self.resume_checkbox.isChecked()
+        processes = self.processes_input.value()
 
         if not excel_file:
             QMessageBox.warning(self, "Input Error", "Please select an Excel file.")
             return
 
-        self.thread = OptionsUploaderThread(excel_file, self.username, self.password, headless)
-        self.thread.progress_update.connect(self.progress_bar.setValue)
-        self.thread.status_update.connect(self.status_label.setText)
-        self.thread.log_update.connect(self.log_textarea.append)
+        self.thread = OptionsUploaderThread(excel_file, self.username, self.password, headless, self.browser_pool,
+                                            self.log_sink, concurrency, use_http, resume, processes)
         self.thread.error_occurred.connect(self.handle_error)
+
+        # A second click would drop the last reference to a running thread.
+        self.upload_button.setDisabled(True)
+        self.thread.finished.connect(lambda: self.upload_button.setDisabled(False))
         self.thread.start()
 
+    def queue_upload(self):
+        excel_file = self.file_input.text()
+        if not excel_file:
+            QMessageBox.warning(self, "Input Error", "Please select an Excel file.")
+            return
+
+        job_id = get_job_queue().enqueue("upload", {
+            "file": excel_file,
+            "headless": self.headless_checkbox.isChecked(),
+            "concurrency": self.concurrency_input.value(),
+            "use_http": self.http_checkbox.isChecked(),
+            "resume": self.resume_checkbox.isChecked(),
+            "processes": self.processes_input.value(),
+        })
+        self.log_view.append(f"Upload queued as job {job_id}.")
+
     def handle_error(self, error_message):
         QMessageBox.critical(self, "Error", error_message)
 
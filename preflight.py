@@ -0,0 +1,89 @@
+import csv
+import threading
+import time
+
+from config import BASE_URL, PREFLIGHT_REQUIRE_REF, PREFLIGHT_CACHE_TTL
+from group_cache import SelectOptionsParser
+from row_readers import OPTION_COLUMNS
+
+_delai_values = {}
+_delai_values_lock = threading.Lock()
+
+
+async def allowed_delai_values(fetch, base_url=BASE_URL, ttl=PREFLIGHT_CACHE_TTL):
+    with _delai_values_lock:
+        values, loaded_at = _delai_values.get(base_url, (None, 0.0))
+    if values is not None and time.monotonic() - loaded_at <= ttl:
+        return values
+
+    parser = SelectOptionsParser("iddelai")
+    parser.feed(await fetch(f"{base_url}/SA_opt_edit.asp?action=add"))
+    values = set(parser.options.values())
+    with _delai_values_lock:
+        _delai_values[base_url] = (values, time.monotonic())
+    return values
+
+
+class PreflightValidator:
+    def __init__(self, allowed_delais=None, require_ref=PREFLIGHT_REQUIRE_REF):
+        self.allowed_delais = allowed_delais
+        self.require_ref = require_ref
+        self.seen_keys = set()
+
+    def validate(self, positions, rows):
+        # Checks a whole batch at once; returns the accepted rows normalised to
+        # form text, and the rejected ones with their reasons.
+        import pandas as pd
+        df = pd.DataFrame.from_records(rows, columns=list(OPTION_COLUMNS), index=positions)
+        text = df.apply(lambda column: column.astype("string").str.strip()).fillna("")
+
+        delai_numbers = pd.to_numeric(df["iddelai"], errors="coerce")
+        integral = delai_numbers.notna() & (delai_numbers % 1 == 0)
+        text.loc[integral, "iddelai"] = delai_numbers[integral].astype("int64").astype("string")
+
+        keys = text["ref"] + "\x1f" + text["optionDescrip"].str.replace(r"\s+", " ", regex=True).str.casefold()
+
+        checks = {
+            "missing optionDescrip": text["optionDescrip"] == "",
+            "duplicate of an earlier row": keys.duplicated() | keys.isin(self.seen_keys),
+        }
+        if self.require_ref:
+            checks["missing ref"] = text["ref"] == ""
+        for column in ("pricetoadd", "prixpublic"):
+            numbers = pd.to_numeric(text[column].str.replace(",", ".", regex=False), errors="coerce")
+            checks[f"invalid {column}"] = (text[column] != "") & (numbers.isna() | (numbers < 0))
+        if self.allowed_delais:
+            checks["unknown iddelai"] = ~text["iddelai"].isin(self.allowed_delais)
+
+        failed = pd.DataFrame(checks)
+        rejected_mask = failed.any(axis=1)
+        self.seen_keys.update(keys[~rejected_mask])
+
+        accepted = list(text[~rejected_mask].to_dict("index").items())
+        rejected = []
+        originals = dict(zip(positions, rows))
+        for position, flags in failed[rejected_mask].iterrows():
+            reasons = [reason for reason, flagged in flags.items() if flagged]
+            rejected.append((position, originals[position], ", ".join(reasons)))
+        return accepted, rejected
+
+
+class RejectedRowsReport:
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def add(self, position, row, reasons):
+        if self._writer is None:
+            self._file = open(self.path, "w", newline="", encoding="utf-8-sig")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(["row", *OPTION_COLUMNS, "reasons"])
+        self._writer.writerow([position + 1, *(row.get(name) for name in OPTION_COLUMNS), reasons])
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
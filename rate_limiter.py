@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from config import (BASE_URL, RATE_LIMIT_INITIAL, RATE_LIMIT_MIN, RATE_LIMIT_MAX, RATE_LIMIT_INCREASE,
+                    RATE_LIMIT_DECREASE, RATE_LIMIT_SLOW_RESPONSE)
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, initial_rate=RATE_LIMIT_INITIAL, min_rate=RATE_LIMIT_MIN, max_rate=RATE_LIMIT_MAX,
+                 increase=RATE_LIMIT_INCREASE, decrease=RATE_LIMIT_DECREASE, slow_response=RATE_LIMIT_SLOW_RESPONSE):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_response = slow_response
+        self._rate = initial_rate
+        self._next_slot = 0.0
+        # Shared by the engine loop and the HTTP transport threads.
+        self._lock = threading.Lock()
+
+    @property
+    def current_rate(self):
+        return self._rate
+
+    async def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self._rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def record_success(self, elapsed):
+        if elapsed > self.slow_response:
+            self.record_failure()
+            return
+        with self._lock:
+            self._rate = min(self.max_rate, self._rate + self.increase)
+
+    def record_failure(self):
+        with self._lock:
+            self._rate = max(self.min_rate, self._rate * self.decrease)
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success(time.monotonic() - started)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(base_url=BASE_URL):
+    with _limiters_lock:
+        limiter = _limiters.get(base_url)
+        if limiter is None:
+            limiter = _limiters[base_url] = AdaptiveRateLimiter()
+        return limiter
+
+
+def current_rates():
+    # Requests per second each server is currently allowed, for monitoring.
+    with _limiters_lock:
+        return {base_url: limiter.current_rate for base_url, limiter in _limiters.items()}
+
+
+def configure_rate_limiter(base_url=BASE_URL, **settings):
+    # Replaces the limiter for base_url, e.g. to give a process its share of
+    # the budget; must run before any workflow picks the old one up.
+    with _limiters_lock:
+        limiter = _limiters[base_url] = AdaptiveRateLimiter(**settings)
+        return limiter
@@ -0,0 +1,201 @@
+import asyncio
+import random
+import sys
+import threading
+import time
+from collections import deque
+
+from config import (BASE_URL, RETRY_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY, RETRY_STATUS_CODES,
+                    RETRY_ERROR_MARKERS, CIRCUIT_WINDOW, CIRCUIT_MIN_CALLS, CIRCUIT_ERROR_RATE,
+                    CIRCUIT_OPEN_SECONDS)
+from session_guard import SessionExpired
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class ResponseError(Exception):
+    # For Playwright, whose page and request APIs return failed responses
+    # instead of raising.
+    def __init__(self, url, status_code):
+        super().__init__(f"HTTP {status_code} from {url}")
+        self.status_code = status_code
+
+
+def raise_for_status(response):
+    if response is not None and response.status >= 400:
+        raise ResponseError(response.url, response.status)
+
+
+def is_retryable(error):
+    # Timeouts, dropped connections and server-side errors may pass on their
+    # own; anything else (bad data, a missing element, a local file error)
+    # would fail again.
+    if isinstance(error, SessionExpired):
+        return False
+    status = getattr(getattr(error, "response", None), "status_code", getattr(error, "status_code", None))
+    if status is not None:
+        return status in RETRY_STATUS_CODES
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    # requests raises its own connection errors; it is only loaded by the
+    # HTTP transport, and without it there are none to classify.
+    requests = sys.modules.get("requests")
+    if requests is not None and isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    # Playwright raises its own Error class; the message says what happened.
+    message = str(error)
+    return any(marker in message for marker in RETRY_ERROR_MARKERS)
+
+
+class CircuitBreaker:
+    # Shared by every worker talking to one server. It keeps the outcome of
+    # the last `window` actions; once `error_rate` of them failed it opens and
+    # every worker waits `open_seconds`, then a single probe decides whether
+    # to close again or stay open.
+    def __init__(self, window=CIRCUIT_WINDOW, min_calls=CIRCUIT_MIN_CALLS, error_rate=CIRCUIT_ERROR_RATE,
+                 open_seconds=CIRCUIT_OPEN_SECONDS):
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._reopen_at = 0.0
+        self._probing = False
+        self._listeners = []
+        # Shared by the engine loop and the HTTP transport threads.
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _set_state(self, state):
+        # Called with the lock held; returns the listeners to notify once released.
+        self.state = state
+        if state == OPEN:
+            self._reopen_at = time.monotonic() + self.open_seconds
+        elif state == CLOSED:
+            self._outcomes.clear()
+        return list(self._listeners)
+
+    def _notify(self, listeners, state):
+        for listener in listeners:
+            listener(state, self.open_seconds)
+
+    async def wait(self):
+        while True:
+            listeners = ()
+            with self._lock:
+                state = self.state
+                if state == CLOSED:
+                    return
+                now = time.monotonic()
+                if state == OPEN and now >= self._reopen_at:
+                    state = HALF_OPEN
+                    listeners = self._set_state(state)
+                if state == HALF_OPEN and not self._probing:
+                    self._probing = True
+                    probe = True
+                else:
+                    probe = False
+                    delay = self._reopen_at - now if state == OPEN else 0.5
+            self._notify(listeners, state)
+            if probe:
+                return
+            await asyncio.sleep(max(0.05, delay))
+
+    def record(self, ok):
+        # ok is None when the action ended without saying anything about the
+        # server, e.g. on bad data; it only frees the probe slot.
+        listeners = ()
+        with self._lock:
+            state = self.state
+            if state == HALF_OPEN and self._probing:
+                self._probing = False
+                if ok is not None:
+                    state = CLOSED if ok else OPEN
+                    listeners = self._set_state(state)
+            elif state == CLOSED and ok is not None:
+                self._outcomes.append(ok)
+                failures = self._outcomes.count(False)
+                if len(self._outcomes) >= self.min_calls and failures >= self.error_rate * len(self._outcomes):
+                    state = OPEN
+                    listeners = self._set_state(state)
+        self._notify(listeners, state)
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(base_url=BASE_URL):
+    with _breakers_lock:
+        breaker = _breakers.get(base_url)
+        if breaker is None:
+            breaker = _breakers[base_url] = CircuitBreaker()
+        return breaker
+
+
+def circuit_message(state, open_seconds):
+    if state == OPEN:
+        return f"The server keeps failing; all workers are paused for {open_seconds:.0f} s."
+    if state == HALF_OPEN:
+        return "Checking whether the server has recovered..."
+    return "The server is answering again; resuming."
+
+
+class RetryPolicy:
+    # Retries one action with exponential backoff and full jitter, behind the
+    # shared circuit breaker. The reporter's circuit callback hears about every
+    # change of the breaker's state until close().
+    def __init__(self, reporter=None, attempts=RETRY_ATTEMPTS, base_delay=RETRY_BASE_DELAY,
+                 max_delay=RETRY_MAX_DELAY, breaker=None):
+        self.reporter = reporter
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or get_circuit_breaker()
+        if reporter is not None:
+            self.breaker.add_listener(self._circuit_changed)
+
+    def _circuit_changed(self, state, open_seconds):
+        self.reporter.circuit(state, circuit_message(state, open_seconds))
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    async def run(self, action, label=None):
+        attempt = 1
+        while True:
+            await self.breaker.wait()
+            ok = None
+            try:
+                result = await action()
+                ok = True
+                return result
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                ok = False
+                if attempt >= self.attempts:
+                    raise
+                error = e
+            finally:
+                self.breaker.record(ok)
+
+            delay = self.delay(attempt)
+            if self.reporter is not None:
+                self.reporter.log(f"{label + ': ' if label else ''}{str(error)}; retrying in {delay:.1f} s "
+                                  f"(attempt {attempt + 1} of {self.attempts}).")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        self.breaker.remove_listener(self._circuit_changed)
@@ -0,0 +1,109 @@
+import csv
+import os
+import threading
+
+OPTION_COLUMNS = ("optionDescrip", "ref", "pricetoadd", "prixpublic", "iddelai")
+SUPPORTED_EXTENSIONS = (".xlsx", ".xlsm", ".xls", ".csv", ".parquet")
+
+
+def iter_option_rows(path):
+    # Yields one small dict per data row, holding only the option columns, as
+    # soon as it is parsed.
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".xlsx", ".xlsm"):
+        return _records(_iter_xlsx(path))
+    if extension == ".csv":
+        return _records(_iter_csv(path))
+    if extension == ".parquet":
+        return _iter_parquet(path)
+    if extension == ".xls":
+        return _iter_xls(path)
+    raise ValueError(f"Unsupported file type '{extension}'. Use one of: {', '.join(SUPPORTED_EXTENSIONS)}")
+
+
+def row_count_hint(path):
+    # Total for the progress bar: file metadata where there is some, a quick
+    # counting pass over a CSV, the frame's length for a legacy .xls.
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        if extension in (".xlsx", ".xlsm"):
+            from openpyxl import load_workbook
+            workbook = load_workbook(path, read_only=True)
+            try:
+                max_row = workbook.active.max_row
+            finally:
+                workbook.close()
+            return max_row - 1 if max_row else None
+        if extension == ".parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetFile(path).metadata.num_rows
+        if extension == ".csv":
+            return sum(1 for _ in _records(_iter_csv(path)))
+        if extension == ".xls":
+            return len(_load_xls(path))
+    except Exception:
+        pass
+    return None
+
+
+def _columns(header):
+    header = [str(name).strip() if name is not None else "" for name in header]
+    missing = [name for name in OPTION_COLUMNS if name not in header]
+    if missing:
+        raise ValueError(f"Missing columns in the input file: {', '.join(missing)}")
+    return [(name, header.index(name)) for name in OPTION_COLUMNS]
+
+
+def _records(rows):
+    rows = iter(rows)
+    columns = _columns(next(rows, ()))
+    for values in rows:
+        if not any(value not in (None, "") for value in values):
+            continue
+        yield {name: values[index] if index < len(values) else None for name, index in columns}
+
+
+def _iter_xlsx(path):
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _iter_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.reader(f)
+
+
+def _iter_parquet(path):
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(path)
+    _columns(parquet_file.schema_arrow.names)
+    for batch in parquet_file.iter_batches(batch_size=1024, columns=list(OPTION_COLUMNS)):
+        yield from batch.to_pylist()
+
+
+_xls_frames = {}
+_xls_lock = threading.Lock()
+
+
+def _load_xls(path):
+    # Legacy .xls has no streaming reader; it is loaded whole, once, and shared
+    # by the reader and row_count_hint. Only the latest file is kept.
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    with _xls_lock:
+        frame = _xls_frames.get(key)
+        if frame is None:
+            import pandas as pd
+            frame = pd.read_excel(path)
+            _xls_frames.clear()
+            _xls_frames[key] = frame
+        return frame
+
+
+def _iter_xls(path):
+    options_df = _load_xls(path)
+    _columns(options_df.columns)
+    yield from options_df[list(OPTION_COLUMNS)].to_dict("records")
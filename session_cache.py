@@ -0,0 +1,55 @@
+import base64
+import hashlib
+import json
+import os
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from config import SESSION_CACHE_DIR, SESSION_CACHE_MAX_AGE
+
+
+class SessionCache:
+    SALT_SIZE = 16
+
+    def __init__(self, username, password, cache_dir=SESSION_CACHE_DIR, max_age=SESSION_CACHE_MAX_AGE):
+        self.username = username
+        self.password = password
+        self.max_age = max_age
+        name = hashlib.sha256(username.encode("utf-8")).hexdigest()
+        self.path = os.path.join(cache_dir, f"{name}.session")
+
+    def _fernet(self, salt):
+        # The key is derived from the password, so a cache file is useless without it.
+        key = hashlib.pbkdf2_hmac("sha256", self.password.encode("utf-8"), salt, 200_000)
+        return Fernet(base64.urlsafe_b64encode(key))
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        salt, token = data[:self.SALT_SIZE], data[self.SALT_SIZE:]
+        try:
+            payload = self._fernet(salt).decrypt(token, ttl=self.max_age)
+        except (InvalidToken, ValueError):
+            self.clear()
+            return None
+        return json.loads(payload)
+
+    def save(self, storage_state):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        salt = os.urandom(self.SALT_SIZE)
+        token = self._fernet(salt).encrypt(json.dumps(storage_state).encode("utf-8"))
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(salt + token)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,51 @@
+from config import SESSION_MAX_REPLAYS
+from step_metrics import get_step_metrics
+
+EXPIRED_MARKER = "Session expirée"
+
+# One round trip: the server either says the session expired or serves the
+# login form in place of the page that was asked for.
+PAGE_EXPIRED = """() => location.pathname.toLowerCase().endsWith('logon.asp')
+    || !!document.querySelector('#adminPass')
+    || (!!document.body && document.body.textContent.includes('Session expirée'))"""
+
+
+class SessionExpired(Exception):
+    def __init__(self, message="The session expired and logging in again did not help."):
+        super().__init__(message)
+
+
+def body_expired(body):
+    return EXPIRED_MARKER in body or "adminPass" in body
+
+
+async def check_page(page):
+    if await page.evaluate(PAGE_EXPIRED):
+        raise SessionExpired()
+
+
+class SessionGuard:
+    # Replays an item after its session expired. renew(stale) is shared by
+    # every worker on the same login and only logs in again if nobody else has
+    # since `stale` was current, so workers that hit the same expiry wait on a
+    # single login. adopt(session), when given, moves the worker's own page
+    # onto the new session before the replay.
+    def __init__(self, renew, session, adopt=None, max_replays=SESSION_MAX_REPLAYS):
+        self.renew = renew
+        self.session = session
+        self.adopt = adopt
+        self.max_replays = max_replays
+        self.metrics = get_step_metrics()
+
+    async def run(self, attempt):
+        for replay in range(self.max_replays + 1):
+            session = self.session
+            try:
+                return await attempt()
+            except SessionExpired:
+                if replay == self.max_replays:
+                    raise
+            with self.metrics.step("session", "renew"):
+                self.session = await self.renew(session)
+            if self.adopt is not None:
+                await self.adopt(self.session)
@@ -0,0 +1,181 @@
+import asyncio
+import csv
+import multiprocessing
+import os
+import queue
+from collections import Counter
+
+from config import UPLOAD_CONCURRENCY, UPLOAD_PROCESS_CAP, RATE_LIMIT_INITIAL, RATE_LIMIT_MAX
+from option_catalog import OptionCatalog
+from retry_policy import RetryPolicy
+from step_metrics import get_step_metrics
+from workflows import OptionUploadWorkflow, Reporter, fetch_text, outcome_of
+
+
+def default_process_count():
+    return max(1, min(os.cpu_count() or 1, UPLOAD_PROCESS_CAP))
+
+
+def run_shard(excel_file, username, password, headless, shard, concurrency, use_http, resume, events):
+    # Runs in a child process with its own engine, browser and login; the
+    # session cache on disk makes every login after the first one cheap.
+    from browser_pool import BrowserPool
+    from rate_limiter import configure_rate_limiter
+
+    index, count = shard
+
+    def send(kind):
+        return lambda payload: events.put((index, kind, payload))
+
+    # The processes split one request budget between them.
+    configure_rate_limiter(initial_rate=RATE_LIMIT_INITIAL / count, max_rate=RATE_LIMIT_MAX / count)
+
+    reporter = Reporter(progress=send("progress"), status=send("status"), log=send("log"), error=send("error"),
+                        circuit=lambda state, message: events.put((index, "circuit", (state, message))))
+    browser_pool = BrowserPool(username, password)
+    try:
+        workflow = OptionUploadWorkflow(excel_file, browser_pool, headless, concurrency, reporter, use_http=use_http,
+                                        resume=resume, shard=shard)
+        browser_pool.engine.run(workflow.run())
+    except Exception as e:
+        reporter.error(f"Shard {index + 1} failed: {str(e)}")
+    finally:
+        browser_pool.close()
+        events.put((index, "metrics", get_step_metrics().snapshot()))
+        events.put((index, "done", None))
+
+
+class ShardedUploadWorkflow:
+    def __init__(self, excel_file, browser_pool, headless, processes=None, concurrency=UPLOAD_CONCURRENCY,
+                 reporter=None, use_http=False, resume=False):
+        self.excel_file = excel_file
+        self.browser_pool = browser_pool
+        self.headless = headless
+        self.processes = max(1, min(processes or default_process_count(), UPLOAD_PROCESS_CAP))
+        self.concurrency = max(1, concurrency)
+        self.reporter = reporter or Reporter()
+        self.use_http = use_http
+        self.resume = resume
+
+    async def run(self):
+        reporter = self.reporter
+        count = self.processes
+        # spawn, not fork: the parent may already be running an engine thread.
+        context = multiprocessing.get_context("spawn")
+        events = context.Queue()
+        workers = [context.Process(target=run_shard, daemon=True,
+                                   args=(self.excel_file, self.browser_pool.username, self.browser_pool.password,
+                                         self.headless, (index, count), self.concurrency, self.use_http,
+                                         self.resume, events))
+                   for index in range(count)]
+
+        reporter.log(f"Starting the upload across {count} processes...")
+        await self.refresh_catalog()
+        progress = [0] * count
+        outcomes = Counter()
+        try:
+            for worker in workers:
+                worker.start()
+
+            running = set(range(count))
+            while running:
+                try:
+                    index, kind, payload = await asyncio.to_thread(events.get, True, 1.0)
+                except queue.Empty:
+                    # A shard killed outright never sends "done".
+                    for index in list(running):
+                        if not workers[index].is_alive():
+                            running.discard(index)
+                            reporter.error(f"Shard {index + 1} exited unexpectedly "
+                                           f"(exit code {workers[index].exitcode}).")
+                    continue
+
+                if kind == "done":
+                    running.discard(index)
+                elif kind == "progress":
+                    progress[index] = payload
+                    reporter.progress(sum(progress) // count)
+                elif kind == "status":
+                    reporter.status(f"[shard {index + 1}/{count}] {payload}")
+                elif kind == "log":
+                    outcome = outcome_of(payload)
+                    if outcome:
+                        outcomes[outcome] += 1
+                    reporter.log(f"[shard {index + 1}/{count}] {payload}")
+                elif kind == "error":
+                    reporter.error(f"[shard {index + 1}/{count}] {payload}")
+                elif kind == "circuit":
+                    state, message = payload
+                    reporter.circuit(state, f"[shard {index + 1}/{count}] {message}")
+                elif kind == "metrics":
+                    # Folded into this process's histograms so /metrics covers every shard.
+                    get_step_metrics().merge(payload)
+
+            for worker in workers:
+                worker.join()
+        finally:
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+                    worker.join()
+
+        rejected_path, rejected = await asyncio.to_thread(self.merge_rejected_reports)
+        reporter.progress(100)
+        reporter.log(f"Upload finished: {outcomes['added']} added, {outcomes['skipped']} skipped, "
+                     f"{outcomes['rejected']} rejected, {outcomes['failed']} failed.")
+        if rejected:
+            reporter.log(f"{rejected} rows failed pre-flight validation, see {rejected_path}")
+        reporter.status("Upload process completed.")
+
+    async def refresh_catalog(self):
+        # Done here, before any shard loads the catalog's keys, so that every
+        # shard starts from the fresh listing; the shards never crawl it.
+        catalog = OptionCatalog()
+        retry = RetryPolicy(self.reporter)
+        transport = None
+        try:
+            with get_step_metrics().step("upload", "catalog-refresh"):
+                if self.use_http:
+                    from http_transport import HttpOptionTransport
+                    transport = HttpOptionTransport(self.browser_pool.username, self.browser_pool.password)
+                    if not await retry.run(lambda: asyncio.to_thread(transport.login), "Login"):
+                        raise RuntimeError("Login failed. Please check your username and password.")
+                    added = await catalog.refresh(lambda url: retry.run(
+                        lambda: asyncio.to_thread(transport.fetch_text, url), url))
+                else:
+                    async with self.browser_pool.lease(self.headless) as context:
+                        added = await catalog.refresh(lambda url: retry.run(lambda: fetch_text(context, url), url))
+            if added:
+                self.reporter.log(f"Option catalog updated with {added} existing options.")
+        except Exception as e:
+            # A stale catalog only means more duplicates reach the server.
+            self.reporter.log(f"Could not refresh the option catalog: {str(e)}")
+        finally:
+            retry.close()
+            if transport is not None:
+                transport.close()
+            catalog.close()
+
+    def merge_rejected_reports(self):
+        base = os.path.splitext(self.excel_file)[0]
+        rows = []
+        header = None
+        for index in range(self.processes):
+            path = f"{base}.rejected.shard{index}.csv"
+            if not os.path.exists(path):
+                continue
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                reader = csv.reader(f)
+                header = next(reader, header)
+                rows.extend(reader)
+            os.remove(path)
+        if not rows:
+            return None, 0
+
+        path = f"{base}.rejected.csv"
+        rows.sort(key=lambda row: int(row[0]))
+        with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return path, len(rows)
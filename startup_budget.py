@@ -0,0 +1,44 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from config import STARTUP_BUDGET, STARTUP_LOG_PATH
+
+# Modules the login window must not need; each one costs hundreds of
+# milliseconds and belongs to a tool that may never be opened.
+HEAVY_MODULES = ("pandas", "playwright", "requests", "cryptography", "openpyxl", "pyarrow")
+
+
+def record_startup(started_at, log_path=STARTUP_LOG_PATH, budget=STARTUP_BUDGET):
+    elapsed = time.perf_counter() - started_at
+    heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+    record = {"at": time.time(), "seconds": round(elapsed, 3), "budget": budget, "heavy_modules": heavy}
+    try:
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError:
+        pass
+    if elapsed > budget or heavy:
+        print(f"Login window took {elapsed:.2f}s to show (budget {budget:.2f}s); "
+              f"heavy modules loaded: {', '.join(heavy) or 'none'}", file=sys.stderr)
+    return elapsed
+
+
+def measure_import(module="login_page"):
+    # A fresh interpreter, so nothing is already cached in sys.modules.
+    code = (f"import sys, time; started = time.perf_counter(); import {module}; "
+            f"print(time.perf_counter() - started); "
+            f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.splitlines()
+    return float(output[0]), [name for name in output[1].split(",") if name] if len(output) > 1 else []
+
+
+if __name__ == "__main__":
+    seconds, heavy = measure_import(sys.argv[1] if len(sys.argv) > 1 else "login_page")
+    print(f"import time: {seconds:.3f}s (budget {STARTUP_BUDGET:.2f}s)")
+    print(f"heavy modules loaded: {', '.join(heavy) or 'none'}")
+    sys.exit(1 if seconds > STARTUP_BUDGET or heavy else 0)
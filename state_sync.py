@@ -0,0 +1,190 @@
+import asyncio
+import json
+import os
+from html.parser import HTMLParser
+
+from config import BASE_URL, UPLOAD_CONCURRENCY
+from option_catalog import OptionCatalog
+from rate_limiter import get_rate_limiter
+from row_readers import iter_option_rows
+from workflows import (GroupOptionsWorkflow, OptionUploadWorkflow, ProductGroupWorkflow, Reporter, fetch_text,
+                       option_fields)
+
+
+# A desired-state file is JSON:
+#   {
+#       "options": "options.xlsx",
+#       "groups": {"Sauces": ["Ketchup", "Mayonnaise"]},
+#       "products": {"Sauces": ["1203", "1204"]}
+#   }
+# "options" is an upload spreadsheet, relative to the state file; "groups" lists
+# the options each group must contain and "products" the products each group
+# must be assigned to. Every section is optional.
+def load_desired_state(path):
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    if not isinstance(state, dict):
+        raise ValueError("The desired-state file must hold a JSON object.")
+
+    options_file = state.get("options")
+    if options_file:
+        options_file = os.path.join(os.path.dirname(os.path.abspath(path)), options_file)
+    groups = {name: [str(option).strip() for option in options if str(option).strip()]
+              for name, options in (state.get("groups") or {}).items()}
+    products = {name: [str(product_id).strip() for product_id in product_ids if str(product_id).strip()]
+                for name, product_ids in (state.get("products") or {}).items()}
+    return {"options": options_file, "groups": groups, "products": products}
+
+
+class _AssignedGroupsParser(HTMLParser):
+    # The groups assigned to a product are listed in the table just above the
+    # idOptionGroup select that adds one. Only that table's cells count, so a
+    # heading or product name that happens to equal a group name does not.
+    def __init__(self):
+        super().__init__()
+        self.cells = None
+        self._tables = []
+        self._last_table = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "table":
+            self._tables.append({"cells": set(), "cell": None})
+        elif tag in ("td", "th") and self._tables:
+            self._tables[-1]["cell"] = []
+        elif tag == "select" and "idOptionGroup" in (attrs.get("id"), attrs.get("name")) and self.cells is None:
+            self.cells = set(self._last_table)
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._tables and self._tables[-1]["cell"] is not None:
+            table = self._tables[-1]
+            text = " ".join("".join(table["cell"]).split())
+            if text:
+                table["cells"].add(text.casefold())
+            table["cell"] = None
+        elif tag == "table" and self._tables:
+            self._last_table = self._tables.pop()["cells"]
+
+    def handle_data(self, data):
+        if self._tables and self._tables[-1]["cell"] is not None:
+            self._tables[-1]["cell"].append(data)
+
+
+def assigned_groups(html, group_names):
+    # Without the select the page is not a product form; nothing is taken as
+    # assigned, so the sync adds the groups rather than skipping them.
+    parser = _AssignedGroupsParser()
+    parser.feed(html)
+    cells = parser.cells or set()
+    return {name for name in group_names if " ".join(name.split()).casefold() in cells}
+
+
+class SyncWorkflow:
+    def __init__(self, state_file, browser_pool, headless, concurrency=UPLOAD_CONCURRENCY, reporter=None,
+                 dry_run=False, full_refresh=False):
+        self.state_file = state_file
+        self.browser_pool = browser_pool
+        self.headless = headless
+        self.concurrency = concurrency
+        self.reporter = reporter or Reporter()
+        self.dry_run = dry_run
+        self.full_refresh = full_refresh
+        self.rate_limiter = get_rate_limiter()
+
+    async def run(self):
+        reporter = self.reporter
+        try:
+            state = await asyncio.to_thread(load_desired_state, self.state_file)
+            reporter.status("Reading the current state from the back office...")
+            missing_options = await self.plan_options(state["options"])
+            missing_members = await self.plan_groups(state["groups"])
+            missing_products = await self.plan_products(state["products"])
+
+            reporter.log(f"Sync plan: {missing_options} options to create, "
+                         f"{sum(map(len, missing_members.values()))} group memberships to add, "
+                         f"{sum(map(len, missing_products.values()))} product assignments to add.")
+            for group_name, options in missing_members.items():
+                reporter.log(f"Group '{group_name}' is missing: {', '.join(options)}")
+            for group_name, product_ids in missing_products.items():
+                reporter.log(f"Group '{group_name}' is not assigned to products: {', '.join(product_ids)}")
+            if self.dry_run:
+                reporter.status("Dry run: nothing was changed.")
+                return
+
+            # Options first, so the groups can find them, then memberships, then
+            # the product links.
+            if missing_options:
+                reporter.status(f"Creating {missing_options} options...")
+                await OptionUploadWorkflow(state["options"], self.browser_pool, self.headless, self.concurrency,
+                                           reporter).run()
+            for group_name, options in missing_members.items():
+                reporter.status(f"Adding {len(options)} options to group '{group_name}'...")
+                await GroupOptionsWorkflow(group_name, options, self.browser_pool, self.headless, reporter).run()
+            for group_name, product_ids in missing_products.items():
+                reporter.status(f"Assigning group '{group_name}' to {len(product_ids)} products...")
+                await ProductGroupWorkflow(product_ids, group_name, self.browser_pool, self.headless,
+                                           reporter).run()
+
+            reporter.progress(100)
+            reporter.status("Sync completed.")
+        except Exception as e:
+            reporter.error(f"An error occurred during sync: {str(e)}")
+
+    async def plan_options(self, options_file):
+        if not options_file:
+            return 0
+        catalog = OptionCatalog()
+        try:
+            async with self.browser_pool.lease(self.headless) as context:
+                added = await catalog.refresh(lambda url: fetch_text(context, url), full=self.full_refresh)
+            if added:
+                self.reporter.log(f"Option catalog updated with {added} existing options.")
+
+            def count_missing():
+                missing = 0
+                for row in iter_option_rows(options_file):
+                    fields = option_fields(row)
+                    if fields["optionDescrip"].strip() and not catalog.contains(fields["ref"], fields["optionDescrip"]):
+                        missing += 1
+                return missing
+            return await asyncio.to_thread(count_missing)
+        finally:
+            catalog.close()
+
+    async def plan_groups(self, groups):
+        missing = {}
+        if not groups:
+            return missing
+        async with self.browser_pool.lease(self.headless) as context:
+            page = await context.new_page()
+            for group_name, options in groups.items():
+                workflow = GroupOptionsWorkflow(group_name, options, self.browser_pool, self.headless, self.reporter)
+                async with self.rate_limiter.slot():
+                    if not await workflow.navigate_to_option_group(page, group_name):
+                        continue
+                    members = await workflow.read_members(page)
+                absent = [option for option in options if option.casefold() not in members]
+                if absent:
+                    missing[group_name] = absent
+        return missing
+
+    async def plan_products(self, products):
+        missing = {}
+        if not products:
+            return missing
+        wanted = {}
+        for group_name, product_ids in products.items():
+            for product_id in product_ids:
+                wanted.setdefault(product_id, []).append(group_name)
+
+        async with self.browser_pool.lease(self.headless) as context:
+            async def read_product(product_id):
+                async with self.rate_limiter.slot():
+                    html = await fetch_text(context, f"{BASE_URL}/SA_prod_edit.asp?action=edit&recid={product_id}")
+                return product_id, assigned_groups(html, wanted[product_id])
+
+            for product_id, assigned in await asyncio.gather(*(read_product(product_id) for product_id in wanted)):
+                for group_name in wanted[product_id]:
+                    if group_name not in assigned:
+                        missing.setdefault(group_name, []).append(product_id)
+        return missing
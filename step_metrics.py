@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import METRICS_ENABLED, METRICS_BUCKETS, METRICS_JSONL_PATH
+from rate_limiter import current_rates
+
+
+class _Step:
+    __slots__ = ("metrics", "workflow", "step", "item", "started")
+
+    def __init__(self, metrics, workflow, step, item):
+        self.metrics = metrics
+        self.workflow = workflow
+        self.step = step
+        self.item = item
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.metrics.observe(self.workflow, self.step, time.perf_counter() - self.started, exc_type is None,
+                             self.item)
+        return False
+
+
+class _NoStep:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NO_STEP = _NoStep()
+
+
+class StepMetrics:
+    # Fixed-bucket histograms per (workflow, step): recording a step is a
+    # bisect and a few additions under a lock, cheap enough to leave on.
+    def __init__(self, buckets=METRICS_BUCKETS, enabled=METRICS_ENABLED, jsonl_path=METRICS_JSONL_PATH):
+        self.buckets = tuple(sorted(buckets))
+        self.enabled = enabled
+        self.jsonl_path = jsonl_path
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._jsonl = None
+
+    def step(self, workflow, step, item=None):
+        if not self.enabled:
+            return _NO_STEP
+        return _Step(self, workflow, step, item)
+
+    def observe(self, workflow, step, seconds, ok=True, item=None):
+        key = (workflow, step)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {"buckets": [0] * (len(self.buckets) + 1), "sum": 0.0,
+                                                     "count": 0, "errors": 0}
+            histogram["buckets"][bisect_left(self.buckets, seconds)] += 1
+            histogram["sum"] += seconds
+            histogram["count"] += 1
+            if not ok:
+                histogram["errors"] += 1
+            if self.jsonl_path:
+                try:
+                    self._write_line({"at": time.time(), "workflow": workflow, "step": step, "item": item,
+                                      "seconds": round(seconds, 6), "ok": ok})
+                except OSError:
+                    # The export must never fail the step it times; stop writing instead.
+                    self._close_jsonl()
+                    self.jsonl_path = None
+
+    def _write_line(self, record):
+        if self._jsonl is None:
+            directory = os.path.dirname(self.jsonl_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._jsonl = open(self.jsonl_path, "a", encoding="utf-8", buffering=1)
+        self._jsonl.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def _close_jsonl(self):
+        if self._jsonl is not None:
+            try:
+                self._jsonl.close()
+            except OSError:
+                pass
+            self._jsonl = None
+
+    def snapshot(self):
+        with self._lock:
+            return [{"workflow": workflow, "step": step, "count": histogram["count"],
+                     "sum": round(histogram["sum"], 6), "errors": histogram["errors"],
+                     "buckets": list(histogram["buckets"])}
+                    for (workflow, step), histogram in sorted(self._histograms.items())]
+
+    def merge(self, snapshot):
+        # Adds a snapshot taken in another process, e.g. an upload shard.
+        with self._lock:
+            for entry in snapshot:
+                key = (entry["workflow"], entry["step"])
+                histogram = self._histograms.setdefault(key, {"buckets": [0] * (len(self.buckets) + 1),
+                                                              "sum": 0.0, "count": 0, "errors": 0})
+                histogram["buckets"] = [a + b for a, b in zip(histogram["buckets"], entry["buckets"])]
+                histogram["sum"] += entry["sum"]
+                histogram["count"] += entry["count"]
+                histogram["errors"] += entry["errors"]
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def summary(self):
+        # Mean and approximate p50/p95 per step, in milliseconds.
+        summary = {}
+        for entry in self.snapshot():
+            if not entry["count"]:
+                continue
+            summary[f"{entry['workflow']}.{entry['step']}"] = {
+                "count": entry["count"],
+                "mean_ms": round(entry["sum"] / entry["count"] * 1000, 1),
+                "p50_ms": self._quantile_ms(entry, 0.5),
+                "p95_ms": self._quantile_ms(entry, 0.95),
+                "errors": entry["errors"],
+            }
+        return summary
+
+    def _quantile_ms(self, entry, fraction):
+        # Upper bound of the bucket holding the quantile.
+        target = fraction * entry["count"]
+        seen = 0
+        for bound, count in zip(self.buckets + (None,), entry["buckets"]):
+            seen += count
+            if seen >= target:
+                return round(bound * 1000, 1) if bound is not None else None
+        return None
+
+    def to_prometheus(self):
+        lines = ["# HELP chr_step_duration_seconds Time spent in each automation step.",
+                 "# TYPE chr_step_duration_seconds histogram"]
+        errors = ["# HELP chr_step_errors_total Steps that raised.", "# TYPE chr_step_errors_total counter"]
+        for entry in self.snapshot():
+            labels = f'workflow="{entry["workflow"]}",step="{entry["step"]}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry["buckets"]):
+                cumulative += count
+                lines.append(f'chr_step_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'chr_step_duration_seconds_bucket{{{labels},le="+Inf"}} {entry["count"]}')
+            lines.append(f"chr_step_duration_seconds_sum{{{labels}}} {entry['sum']}")
+            lines.append(f"chr_step_duration_seconds_count{{{labels}}} {entry['count']}")
+            errors.append(f"chr_step_errors_total{{{labels}}} {entry['errors']}")
+        rates = ["# HELP chr_rate_limit_per_second Requests per second the adaptive rate limiter allows.",
+                 "# TYPE chr_rate_limit_per_second gauge"]
+        for base_url, rate in sorted(current_rates().items()):
+            rates.append(f'chr_rate_limit_per_second{{base_url="{base_url}"}} {round(rate, 3)}')
+        return "\n".join(lines + errors + rates) + "\n"
+
+    def close(self):
+        with self._lock:
+            self._close_jsonl()
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_step_metrics():
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = StepMetrics()
+        return _metrics
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = get_step_metrics().to_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port, host="127.0.0.1"):
+    # Serves /metrics in the Prometheus text format from a daemon thread.
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
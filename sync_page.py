@@ -0,0 +1,109 @@
+import sys
+from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QLineEdit,
+                             QFileDialog, QProgressBar, QCheckBox, QMessageBox)
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from browser_pool import BrowserPool
+from log_pipeline import LogSink
+from log_view import LogView
+from state_sync import SyncWorkflow
+
+
+class SyncWorker(QThread):
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, state_file, headless, browser_pool, log_sink, dry_run=False, full_refresh=False):
+        super().__init__()
+        self.state_file = state_file
+        self.headless = headless
+        self.browser_pool = browser_pool
+        self.log_sink = log_sink
+        self.dry_run = dry_run
+        self.full_refresh = full_refresh
+
+    def run(self):
+        reporter = self.log_sink.reporter(error=self.error_occurred.emit)
+        workflow = SyncWorkflow(self.state_file, self.browser_pool, self.headless, reporter=reporter,
+                                dry_run=self.dry_run, full_refresh=self.full_refresh)
+        self.browser_pool.engine.run(workflow.run())
+
+
+class SyncGUI(QWidget):
+    def __init__(self, username, password, browser_pool=None):
+        super().__init__()
+        self.username = username
+        self.password = password
+        self.browser_pool = browser_pool or BrowserPool(username, password)
+        self.initUI()
+
+    def initUI(self):
+        self.setWindowTitle('RestoConcept Catalog Sync')
+        self.setGeometry(100, 100, 600, 600)
+
+        layout = QVBoxLayout()
+
+        layout.addWidget(QLabel("Select desired-state file:"))
+        file_layout = QHBoxLayout()
+        self.file_input = QLineEdit()
+        self.file_button = QPushButton("Browse")
+        self.file_button.clicked.connect(self.browse_file)
+        file_layout.addWidget(self.file_input)
+        file_layout.addWidget(self.file_button)
+        layout.addLayout(file_layout)
+
+        self.headless_checkbox = QCheckBox("Run in headless mode")
+        self.headless_checkbox.setChecked(True)
+        layout.addWidget(self.headless_checkbox)
+
+        self.dry_run_checkbox = QCheckBox("Dry run (only show what would change)")
+        layout.addWidget(self.dry_run_checkbox)
+
+        self.full_refresh_checkbox = QCheckBox("Re-read the whole options list")
+        layout.addWidget(self.full_refresh_checkbox)
+
+        self.sync_button = QPushButton("Sync")
+        self.sync_button.clicked.connect(self.start_sync)
+        layout.addWidget(self.sync_button)
+
+        self.progress_bar = QProgressBar()
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+        self.log_sink = LogSink("sync")
+        self.log_view = LogView(self.log_sink)
+        self.log_view.status_changed.connect(self.status_label.setText)
+        self.log_view.progress_changed.connect(self.progress_bar.setValue)
+        layout.addWidget(self.log_view)
+
+        self.setLayout(layout)
+
+    def browse_file(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select desired-state file", "", "JSON (*.json)")
+        if file_path:
+            self.file_input.setText(file_path)
+
+    def start_sync(self):
+        state_file = self.file_input.text()
+        if not state_file:
+            QMessageBox.warning(self, "Input Error", "Please select a desired-state file.")
+            return
+
+        self.thread = SyncWorker(state_file, self.headless_checkbox.isChecked(), self.browser_pool,
+                                 self.log_sink, self.dry_run_checkbox.isChecked(),
+                                 self.full_refresh_checkbox.isChecked())
+        self.thread.error_occurred.connect(self.handle_error)
+
+        self.sync_button.setDisabled(True)
+        self.thread.finished.connect(lambda: self.sync_button.setDisabled(False))
+        self.thread.start()
+
+    def handle_error(self, error_message):
+        QMessageBox.critical(self, "Error", error_message)
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    gui = SyncGUI("example_user", "example_pass")
+    gui.show()
+    sys.exit(app.exec_())
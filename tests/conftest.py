@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# config reads this at import time; keep test runs out of the real app data.
+os.environ.setdefault("CHR_APP_DATA_DIR", tempfile.mkdtemp(prefix="chr-tests-"))
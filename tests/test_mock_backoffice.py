@@ -0,0 +1,92 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+for module in ("requests", "cryptography", "playwright"):
+    pytest.importorskip(module)
+
+from mock_backoffice import BackOfficeState, start_server  # noqa: E402
+from conftest import ROOT  # noqa: E402
+
+
+def write_rows(path, count, prefix="Option"):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("optionDescrip,ref,pricetoadd,prixpublic,iddelai\n")
+        for i in range(count):
+            f.write(f"{prefix} {i},REF{i:04d},\"1,50\",2,1\n")
+
+
+def run_cli(server, data_dir, *args):
+    # A subprocess, so that config picks up the mock's URL at import time.
+    env = dict(os.environ, CHR_BASE_URL=server.base_url, CHR_APP_DATA_DIR=str(data_dir),
+               CHR_USERNAME="test", CHR_PASSWORD="secret")
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "cli.py"), *args], env=env, cwd=ROOT,
+                            capture_output=True, text=True, timeout=120)
+    events = [json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")]
+    return result.returncode, events
+
+
+@pytest.fixture
+def server():
+    server = start_server(state=BackOfficeState(groups=2, products=5))
+    yield server
+    server.shutdown()
+
+
+def test_http_upload_creates_every_option_once(server, tmp_path):
+    path = tmp_path / "options.csv"
+    write_rows(path, 20)
+
+    status, events = run_cli(server, tmp_path / "data", "upload", str(path), "--http")
+    assert status == 0, events
+    assert len(server.state.options) == 20
+    assert events[-1] == {**events[-1], "event": "finished", "errors": 0}
+
+    # The second run knows every row from the catalog and sends nothing.
+    requests_before = server.state.requests
+    status, events = run_cli(server, tmp_path / "data", "upload", str(path), "--http")
+    assert status == 0
+    assert sum("already in the catalog" in event.get("message", "") for event in events) == 20
+    assert server.state.requests - requests_before < 10
+
+
+def test_http_upload_logs_in_again_after_expiry(server, tmp_path):
+    path = tmp_path / "options.csv"
+    write_rows(path, 20, prefix="Expiring")
+
+    # Drop every session once a few options exist, as a server timeout would.
+    def expire_sessions():
+        while len(server.state.options) < 5:
+            time.sleep(0.01)
+        with server.state.lock:
+            server.state.sessions.clear()
+
+    expirer = threading.Thread(target=expire_sessions, daemon=True)
+    expirer.start()
+    status, events = run_cli(server, tmp_path / "data", "upload", str(path), "--http")
+    assert status == 0, events
+    assert len(server.state.options) == 20
+    # One login at the start and one shared renewal, not one per submitter.
+    assert len(server.state.sessions) == 1
+
+
+def test_http_login_tells_server_errors_from_bad_credentials():
+    import requests
+    from http_transport import HttpOptionTransport
+
+    server = start_server(state=BackOfficeState(groups=1, products=1), error_rate=1.0)
+    transport = HttpOptionTransport("test", "secret", base_url=server.base_url)
+    try:
+        with pytest.raises(requests.HTTPError):
+            transport.login_with_form()
+        server.RequestHandlerClass.error_rate = 0.0
+        transport.password = ""
+        assert not transport.login_with_form()
+    finally:
+        transport.close()
+        server.shutdown()
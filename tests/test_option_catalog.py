@@ -0,0 +1,161 @@
+import asyncio
+
+from option_catalog import OptionCatalog, parse_options_listing
+
+
+def listing(rows, next_link=None, header=("ID", "Ref", "Description")):
+    cells = "".join(f"<th>{name}</th>" for name in header)
+    body = "".join(f'<tr><td><a href="/SA_opt_edit.asp?action=edit&recid={recid}">{recid}</a></td>'
+                   f"<td>{ref}</td><td>{description}</td></tr>" for recid, ref, description in rows)
+    html = f"<table><tr>{cells}</tr>{body}</table>"
+    if next_link:
+        html += f'<a href="{next_link[1]}">{next_link[0]}</a>'
+    return html
+
+
+def test_parse_reads_rows_after_the_header():
+    html = ("<table><tr><td>Menu</td></tr></table>"
+            + listing([("7", "R1", "Sauce  tomate"), ("8", "R2", "Frites")]))
+    entries, next_url = parse_options_listing(html)
+    assert entries == [("7", "R1", "Sauce tomate"), ("8", "R2", "Frites")]
+    assert next_url is None
+
+
+def test_parse_matches_french_headers_case_insensitively():
+    html = listing([("3", "X9", "Mayonnaise")], header=("N°", "Réf", "Libellé"))
+    assert parse_options_listing(html)[0] == [("3", "X9", "Mayonnaise")]
+
+
+def test_parse_without_header_finds_nothing():
+    html = "<table><tr><td>1</td><td>R1</td><td>Frites</td></tr></table>"
+    assert parse_options_listing(html)[0] == []
+
+
+def test_parse_skips_short_rows_and_rows_without_recid():
+    html = ("<table><tr><th>Ref</th><th>Description</th></tr>"
+            "<tr><td>only one cell</td></tr>"
+            "<tr><td>R5</td><td>Sans lien</td></tr></table>")
+    assert parse_options_listing(html)[0] == [(None, "R5", "Sans lien")]
+
+
+def test_parse_finds_the_next_page_link():
+    for text in ("Suivant", "»"):
+        html = listing([("1", "R1", "A")], next_link=(text, "/options/optionslist.asp?page=2"))
+        assert parse_options_listing(html)[1] == "/options/optionslist.asp?page=2"
+
+
+def test_parse_ignores_other_links():
+    html = listing([("1", "R1", "A")], next_link=("Précédent", "/options/optionslist.asp?page=0"))
+    assert parse_options_listing(html)[1] is None
+
+
+def test_keys_are_normalised(tmp_path):
+    catalog = OptionCatalog(str(tmp_path / "catalog.sqlite3"))
+    try:
+        assert catalog.add(" R1 ", "Sauce   Tomate")
+        assert catalog.contains("R1", "sauce tomate")
+        assert not catalog.add("R1", "SAUCE TOMATE")
+        assert not catalog.contains("R2", "sauce tomate")
+    finally:
+        catalog.close()
+
+
+def crawl(catalog, pages, full=True):
+    async def fetch(url):
+        return pages[url]
+    return asyncio.run(catalog.refresh(fetch, full=full))
+
+
+def test_refresh_follows_pages_and_stops_on_a_loop(tmp_path):
+    first = OptionCatalog.LISTING_URL
+    second = f"{first}?page=2"
+    pages = {
+        first: listing([("2", "R2", "B")], next_link=("Suivant", "optionslist.asp?page=2")),
+        second: listing([("1", "R1", "A")], next_link=("Suivant", "optionslist.asp")),
+    }
+    catalog = OptionCatalog(str(tmp_path / "catalog.sqlite3"))
+    try:
+        assert crawl(catalog, pages) == 2
+        assert catalog.contains("R1", "A") and catalog.contains("R2", "B")
+    finally:
+        catalog.close()
+
+
+def test_refresh_drops_options_deleted_on_the_server(tmp_path):
+    path = str(tmp_path / "catalog.sqlite3")
+    catalog = OptionCatalog(path)
+    try:
+        crawl(catalog, {OptionCatalog.LISTING_URL: listing([("1", "R1", "A"), ("2", "R2", "B")])})
+        assert crawl(catalog, {OptionCatalog.LISTING_URL: listing([("1", "R1", "A")])}) == 0
+        assert not catalog.contains("R2", "B")
+    finally:
+        catalog.close()
+
+    reopened = OptionCatalog(path)
+    try:
+        assert reopened.contains("R1", "A")
+        assert not reopened.contains("R2", "B")
+    finally:
+        reopened.close()
+
+
+def test_unreadable_listing_keeps_the_catalog(tmp_path):
+    catalog = OptionCatalog(str(tmp_path / "catalog.sqlite3"))
+    try:
+        crawl(catalog, {OptionCatalog.LISTING_URL: listing([("1", "R1", "A")])})
+        crawl(catalog, {OptionCatalog.LISTING_URL: "<p>Maintenance</p>"})
+        assert catalog.contains("R1", "A")
+    finally:
+        catalog.close()
+
+
+def test_incremental_refresh_stops_at_the_first_known_page(tmp_path):
+    first = OptionCatalog.LISTING_URL
+    catalog = OptionCatalog(str(tmp_path / "catalog.sqlite3"))
+    try:
+        crawl(catalog, {first: listing([("2", "R2", "B"), ("1", "R1", "A")])})
+        # Page 3 is missing, so fetching it would raise.
+        pages = {
+            first: listing([("3", "R3", "C"), ("2", "R2", "B")], next_link=("Suivant", "optionslist.asp?page=2")),
+            f"{first}?page=2": listing([("1", "R1", "A")], next_link=("Suivant", "optionslist.asp?page=3")),
+        }
+        assert crawl(catalog, pages, full=False) == 1
+        assert catalog.contains("R3", "C")
+        pages = {first: listing([("3", "R3", "C")], next_link=("Suivant", "optionslist.asp?page=2"))}
+        assert crawl(catalog, pages, full=False) == 0
+    finally:
+        catalog.close()
+
+
+def test_incremental_refresh_keeps_options_missing_from_the_listing(tmp_path):
+    catalog = OptionCatalog(str(tmp_path / "catalog.sqlite3"))
+    try:
+        crawl(catalog, {OptionCatalog.LISTING_URL: listing([("1", "R1", "A"), ("2", "R2", "B")])})
+        crawl(catalog, {OptionCatalog.LISTING_URL: listing([("1", "R1", "A")])}, full=False)
+        assert catalog.contains("R2", "B")
+    finally:
+        catalog.close()
+
+
+def test_stale_catalog_gets_a_full_crawl(tmp_path):
+    catalog = OptionCatalog(str(tmp_path / "catalog.sqlite3"), max_age=0)
+    try:
+        crawl(catalog, {OptionCatalog.LISTING_URL: listing([("1", "R1", "A"), ("2", "R2", "B")])})
+        crawl(catalog, {OptionCatalog.LISTING_URL: listing([("1", "R1", "A")])}, full=False)
+        assert not catalog.contains("R2", "B")
+    finally:
+        catalog.close()
+
+
+def test_unreadable_page_stops_a_full_crawl_from_dropping_options(tmp_path):
+    first = OptionCatalog.LISTING_URL
+    second = f"{first}?page=2"
+    catalog = OptionCatalog(str(tmp_path / "catalog.sqlite3"))
+    try:
+        crawl(catalog, {first: listing([("2", "R2", "B")], next_link=("Suivant", "optionslist.asp?page=2")),
+                        second: listing([("1", "R1", "A")])})
+        crawl(catalog, {first: listing([("2", "R2", "B")], next_link=("Suivant", "optionslist.asp?page=2")),
+                        second: "<p>Maintenance</p>"})
+        assert catalog.contains("R1", "A")
+    finally:
+        catalog.close()
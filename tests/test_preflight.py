@@ -0,0 +1,72 @@
+import pytest
+
+pytest.importorskip("pandas")
+
+from preflight import PreflightValidator  # noqa: E402
+
+
+def row(description="Sauce", ref="R1", price="1,50", public_price="2", delai="1"):
+    return {"optionDescrip": description, "ref": ref, "pricetoadd": price, "prixpublic": public_price,
+            "iddelai": delai}
+
+
+def reasons_by_position(rejected):
+    return {position: reasons for position, _, reasons in rejected}
+
+
+def test_accepts_and_normalises_rows():
+    accepted, rejected = PreflightValidator().validate([4], [row(description="  Sauce ", delai=2.0)])
+    assert rejected == []
+    (position, fields), = accepted
+    assert position == 4
+    assert fields["optionDescrip"] == "Sauce"
+    assert fields["iddelai"] == "2"
+    assert fields["pricetoadd"] == "1,50"
+
+
+def test_rejects_missing_description_and_bad_prices():
+    rows = [row(description="  "), row(ref="R2", price="abc"), row(ref="R3", public_price="-1")]
+    accepted, rejected = PreflightValidator().validate([0, 1, 2], rows)
+    assert accepted == []
+    assert reasons_by_position(rejected) == {
+        0: "missing optionDescrip",
+        1: "invalid pricetoadd",
+        2: "invalid prixpublic",
+    }
+
+
+def test_empty_prices_are_allowed():
+    accepted, rejected = PreflightValidator().validate([0], [row(price=None, public_price="")])
+    assert rejected == [] and len(accepted) == 1
+
+
+def test_duplicates_within_and_across_batches():
+    validator = PreflightValidator()
+    accepted, rejected = validator.validate([0, 1], [row(description="Sauce  Tomate"), row(description="sauce tomate")])
+    assert [position for position, _ in accepted] == [0]
+    assert reasons_by_position(rejected) == {1: "duplicate of an earlier row"}
+
+    accepted, rejected = validator.validate([2], [row(description="SAUCE TOMATE")])
+    assert accepted == []
+    assert reasons_by_position(rejected) == {2: "duplicate of an earlier row"}
+
+
+def test_rejected_rows_do_not_block_later_duplicates():
+    validator = PreflightValidator()
+    validator.validate([0], [row(price="abc")])
+    accepted, rejected = validator.validate([1], [row()])
+    assert rejected == [] and len(accepted) == 1
+
+
+def test_unknown_iddelai_and_required_ref():
+    validator = PreflightValidator(allowed_delais={"1", "2"}, require_ref=True)
+    accepted, rejected = validator.validate([0, 1], [row(delai="9"), row(ref="", description="Frites")])
+    assert accepted == []
+    assert reasons_by_position(rejected) == {0: "unknown iddelai", 1: "missing ref"}
+
+
+def test_rejected_rows_keep_their_original_values():
+    original = row(description="", price="abc")
+    _, rejected = PreflightValidator().validate([0], [original])
+    assert rejected[0][1] is original
+    assert rejected[0][2] == "missing optionDescrip, invalid pricetoadd"
@@ -0,0 +1,184 @@
+import asyncio
+
+import pytest
+
+from retry_policy import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, ResponseError, RetryPolicy, is_retryable
+from session_guard import SessionExpired
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class HttpError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code)
+
+
+class RecordingReporter:
+    def __init__(self):
+        self.logs = []
+        self.states = []
+
+    def log(self, message):
+        self.logs.append(message)
+
+    def circuit(self, state, message):
+        self.states.append(state)
+
+
+def breaker(**settings):
+    settings = {"window": 10, "min_calls": 4, "error_rate": 0.5, "open_seconds": 0.05, **settings}
+    return CircuitBreaker(**settings)
+
+
+def test_classifies_errors():
+    assert is_retryable(TimeoutError())
+    assert is_retryable(ConnectionResetError())
+    assert is_retryable(HttpError(503))
+    assert is_retryable(Exception("Timeout 30000ms exceeded."))
+    assert is_retryable(Exception("net::ERR_CONNECTION_REFUSED at http://x"))
+    assert is_retryable(ResponseError("http://x/logon.asp", 500))
+    assert not is_retryable(HttpError(404))
+    assert not is_retryable(ResponseError("http://x/logon.asp", 404))
+    assert not is_retryable(FileNotFoundError(2, "No such file or directory"))
+    assert not is_retryable(PermissionError(13, "Permission denied"))
+    assert not is_retryable(ValueError("bad row"))
+    assert not is_retryable(SessionExpired())
+
+
+def test_classifies_requests_errors():
+    requests = pytest.importorskip("requests")
+    assert is_retryable(requests.ConnectionError("Max retries exceeded"))
+    assert is_retryable(requests.ReadTimeout("Read timed out."))
+
+
+def test_breaker_stays_closed_below_min_calls():
+    circuit = breaker()
+    for _ in range(3):
+        circuit.record(False)
+    assert circuit.state == CLOSED
+
+
+def test_breaker_opens_at_the_error_rate():
+    circuit = breaker()
+    for ok in (True, True, False, True, False):
+        circuit.record(ok)
+    assert circuit.state == CLOSED
+    circuit.record(False)
+    assert circuit.state == OPEN
+
+
+def test_breaker_ignores_outcomes_without_a_verdict():
+    circuit = breaker()
+    for _ in range(10):
+        circuit.record(None)
+    circuit.record(False)
+    assert circuit.state == CLOSED
+
+
+def open_breaker(**settings):
+    circuit = breaker(**settings)
+    for _ in range(4):
+        circuit.record(False)
+    assert circuit.state == OPEN
+    return circuit
+
+
+def test_half_open_lets_one_probe_through_and_closes_on_success():
+    circuit = open_breaker()
+    states = []
+    circuit.add_listener(lambda state, seconds: states.append(state))
+
+    async def scenario():
+        await asyncio.wait_for(circuit.wait(), 1)
+        assert circuit.state == HALF_OPEN
+        second = asyncio.ensure_future(circuit.wait())
+        await asyncio.sleep(0.1)
+        assert not second.done()
+        circuit.record(True)
+        await asyncio.wait_for(second, 1)
+
+    asyncio.run(scenario())
+    assert circuit.state == CLOSED
+    assert states == [HALF_OPEN, CLOSED]
+
+
+def test_failed_probe_opens_again():
+    circuit = open_breaker()
+
+    async def scenario():
+        await asyncio.wait_for(circuit.wait(), 1)
+        circuit.record(False)
+
+    asyncio.run(scenario())
+    assert circuit.state == OPEN
+
+
+def test_probe_without_a_verdict_frees_the_slot():
+    circuit = open_breaker()
+
+    async def scenario():
+        await asyncio.wait_for(circuit.wait(), 1)
+        circuit.record(None)
+        assert circuit.state == HALF_OPEN
+        await asyncio.wait_for(circuit.wait(), 1)
+
+    asyncio.run(scenario())
+
+
+def test_policy_retries_transient_errors():
+    reporter = RecordingReporter()
+    policy = RetryPolicy(reporter, attempts=3, base_delay=0.001, breaker=breaker(min_calls=100))
+    calls = []
+
+    async def action():
+        calls.append(1)
+        if len(calls) < 3:
+            raise TimeoutError("Timeout 30000ms exceeded.")
+        return "done"
+
+    try:
+        assert asyncio.run(policy.run(action, "Option 1")) == "done"
+    finally:
+        policy.close()
+    assert len(calls) == 3
+    assert len(reporter.logs) == 2 and reporter.logs[0].startswith("Option 1: Timeout")
+
+
+def test_policy_gives_up_after_the_last_attempt():
+    policy = RetryPolicy(attempts=2, base_delay=0.001, breaker=breaker(min_calls=100))
+
+    async def action():
+        raise TimeoutError("Timeout 30000ms exceeded.")
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(policy.run(action))
+
+
+@pytest.mark.parametrize("error", [ValueError("bad row"), SessionExpired()])
+def test_policy_does_not_retry_other_errors(error):
+    policy = RetryPolicy(attempts=3, base_delay=0.001, breaker=breaker())
+    calls = []
+
+    async def action():
+        calls.append(1)
+        raise error
+
+    with pytest.raises(type(error)):
+        asyncio.run(policy.run(action))
+    assert len(calls) == 1
+    assert policy.breaker.state == CLOSED
+
+
+def test_reporter_follows_the_breaker_until_closed():
+    reporter = RecordingReporter()
+    circuit = breaker()
+    policy = RetryPolicy(reporter, breaker=circuit)
+    for _ in range(4):
+        circuit.record(False)
+    policy.close()
+    circuit.record(False)
+    assert reporter.states == [OPEN]
@@ -0,0 +1,80 @@
+import json
+import os
+
+import pytest
+
+from step_metrics import StepMetrics
+
+
+def test_steps_fill_the_histogram_buckets():
+    metrics = StepMetrics(buckets=(0.1, 1.0), enabled=True, jsonl_path=None)
+    metrics.observe("upload", "submit", 0.05)
+    metrics.observe("upload", "submit", 0.5, ok=False)
+    metrics.observe("upload", "submit", 5.0)
+    (entry,) = metrics.snapshot()
+    assert entry["buckets"] == [1, 1, 1]
+    assert entry["count"] == 3 and entry["errors"] == 1
+    assert metrics.summary()["upload.submit"]["p50_ms"] == 1000.0
+
+
+def test_step_records_failures_and_does_not_swallow_them():
+    metrics = StepMetrics(enabled=True, jsonl_path=None)
+    with pytest.raises(ValueError):
+        with metrics.step("upload", "submit"):
+            raise ValueError("bad row")
+    assert metrics.snapshot()[0]["errors"] == 1
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = StepMetrics(enabled=False, jsonl_path=None)
+    with metrics.step("upload", "submit"):
+        pass
+    assert metrics.snapshot() == []
+
+
+def test_merge_adds_another_snapshot():
+    metrics = StepMetrics(buckets=(1.0,), enabled=True, jsonl_path=None)
+    shard = StepMetrics(buckets=(1.0,), enabled=True, jsonl_path=None)
+    metrics.observe("upload", "submit", 0.5)
+    shard.observe("upload", "submit", 2.0, ok=False)
+    metrics.merge(shard.snapshot())
+    (entry,) = metrics.snapshot()
+    assert entry["buckets"] == [1, 1] and entry["count"] == 2 and entry["errors"] == 1
+
+
+def test_prometheus_buckets_are_cumulative():
+    metrics = StepMetrics(buckets=(0.1, 1.0), enabled=True, jsonl_path=None)
+    metrics.observe("upload", "submit", 0.05)
+    metrics.observe("upload", "submit", 0.5)
+    text = metrics.to_prometheus()
+    assert 'chr_step_duration_seconds_bucket{workflow="upload",step="submit",le="1.0"} 2' in text
+    assert 'chr_step_duration_seconds_bucket{workflow="upload",step="submit",le="+Inf"} 2' in text
+
+
+def test_jsonl_export_to_a_bare_filename(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    metrics = StepMetrics(enabled=True, jsonl_path="m.jsonl")
+    with metrics.step("upload", "submit", item=3):
+        pass
+    metrics.close()
+    with open(tmp_path / "m.jsonl", encoding="utf-8") as f:
+        (record,) = [json.loads(line) for line in f]
+    assert record["workflow"] == "upload" and record["item"] == 3 and record["ok"]
+
+
+def test_export_failure_turns_the_export_off(tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    metrics = StepMetrics(enabled=True, jsonl_path=os.path.join(str(blocker), "m.jsonl"))
+    with metrics.step("upload", "submit"):
+        pass
+    assert metrics.jsonl_path is None
+    assert metrics.snapshot()[0]["count"] == 1
+
+
+def test_prometheus_exports_the_rate_limits():
+    from rate_limiter import configure_rate_limiter
+
+    configure_rate_limiter("http://metrics.test", initial_rate=2.5)
+    text = StepMetrics(enabled=True, jsonl_path=None).to_prometheus()
+    assert 'chr_rate_limit_per_second{base_url="http://metrics.test"} 2.5' in text
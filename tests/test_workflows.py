@@ -0,0 +1,31 @@
+import sqlite3
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from workflows import OptionUploadWorkflow, outcome_of  # noqa: E402
+
+
+class LockedCatalog:
+    def add(self, ref, description):
+        raise sqlite3.OperationalError("database is locked")
+
+
+class RecordingJournal:
+    def __init__(self):
+        self.records = []
+
+    def record(self, position, done, message):
+        self.records.append((position, done, message))
+
+
+def test_failed_catalog_write_does_not_fail_the_row():
+    workflow = OptionUploadWorkflow("options.csv", None, True)
+    workflow.catalog = LockedCatalog()
+    workflow.journal = RecordingJournal()
+    messages = workflow.record_result(4, {"ref": "R1", "optionDescrip": "Sauce"}, "Option added successfully.")
+    assert messages[0] == "Option added successfully."
+    assert "database is locked" in messages[1]
+    assert [outcome_of(message) for message in messages] == ["added", None]
+    assert workflow.journal.records == [(4, True, "Option added successfully.")]
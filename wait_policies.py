@@ -0,0 +1,71 @@
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from config import WAIT_TIMEOUT
+
+
+class WaitForNavigation:
+    # "commit" returns as soon as the server answers; follow-up fills and clicks
+    # auto-wait for their element, so only reads need "domcontentloaded".
+    def __init__(self, wait_until="commit", url=None, timeout=WAIT_TIMEOUT):
+        self.wait_until = wait_until
+        self.url = url
+        self.timeout = timeout
+
+    async def goto(self, page, url):
+        return await page.goto(url, wait_until=self.wait_until, timeout=self.timeout)
+
+    async def perform(self, page, action):
+        kwargs = {"wait_until": self.wait_until, "timeout": self.timeout}
+        if self.url:
+            kwargs["url"] = self.url
+        async with page.expect_navigation(**kwargs):
+            await action()
+
+
+class WaitForResponse:
+    # For posts whose answer matters more than the page it renders: returns
+    # the first response to a URL containing url_pattern, so the caller can
+    # check its status. after_navigation also waits for the page to commit
+    # the document the action navigated to, so it can be inspected next.
+    def __init__(self, url_pattern, method=None, timeout=WAIT_TIMEOUT, after_navigation=False):
+        self.url_pattern = url_pattern
+        self.method = method
+        self.timeout = timeout
+        self.after_navigation = after_navigation
+
+    def matches(self, response):
+        return self.url_pattern in response.url and (self.method is None or response.request.method == self.method)
+
+    async def perform(self, page, action):
+        async with page.expect_response(self.matches, timeout=self.timeout) as response_info:
+            if self.after_navigation:
+                async with page.expect_navigation(wait_until="commit", timeout=self.timeout):
+                    await action()
+            else:
+                await action()
+        return await response_info.value
+
+
+class WaitForSelector:
+    # after_navigation: the action navigates and the old page may already show
+    # one of the selectors, so only look once the new document has committed.
+    def __init__(self, *selectors, timeout=WAIT_TIMEOUT, optional=False, after_navigation=False):
+        self.selectors = selectors
+        self.timeout = timeout
+        self.optional = optional
+        self.after_navigation = after_navigation
+
+    async def perform(self, page, action):
+        if self.after_navigation:
+            async with page.expect_navigation(wait_until="commit", timeout=self.timeout):
+                await action()
+        else:
+            await action()
+        locator = page.locator(self.selectors[0])
+        for selector in self.selectors[1:]:
+            locator = locator.or_(page.locator(selector))
+        try:
+            await locator.first.wait_for(timeout=self.timeout)
+        except PlaywrightTimeoutError:
+            if not self.optional:
+                raise
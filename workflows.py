@@ -0,0 +1,699 @@
+import asyncio
+import math
+import os
+import zlib
+from itertools import islice
+
+from config import BASE_URL, UPLOAD_CONCURRENCY, RESULT_MARKER_TIMEOUT, GROUP_BATCH_MODE, READ_BATCH_SIZE
+from group_cache import get_group_directory
+from job_journal import JobJournal, file_digest
+from option_catalog import OptionCatalog
+from preflight import PreflightValidator, RejectedRowsReport, allowed_delai_values
+from rate_limiter import get_rate_limiter
+from retry_policy import RetryPolicy, raise_for_status
+from session_guard import SessionExpired, SessionGuard, body_expired, check_page
+from step_metrics import get_step_metrics
+from row_readers import OPTION_COLUMNS, iter_option_rows, row_count_hint
+from wait_policies import WaitForNavigation, WaitForResponse, WaitForSelector
+
+
+def _ignore(*args):
+    pass
+
+
+class Reporter:
+    def __init__(self, progress=None, status=None, log=None, error=None, circuit=None):
+        self.progress = progress or _ignore
+        self.status = status or _ignore
+        self.log = log or _ignore
+        self.error = error or _ignore
+        # circuit(state, message) follows the retry layer's circuit breaker.
+        self.circuit = circuit or _ignore
+
+
+async def fetch_text(context, url):
+    response = await context.request.get(url)
+    raise_for_status(response)
+    text = await response.text()
+    if body_expired(text):
+        raise SessionExpired()
+    return text
+
+
+def _cell_text(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    return str(value)
+
+
+def outcome_of(message):
+    # Classifies the per-row messages of an option upload.
+    if message.startswith("Option added successfully"):
+        return "added"
+    if message.startswith("Option already"):
+        return "skipped"
+    if message.startswith("Row rejected before upload"):
+        return "rejected"
+    if message.startswith(("Error processing option", "Unexpected result")):
+        return "failed"
+    return None
+
+
+def option_fields(row):
+    return {name: _cell_text(row.get(name)) for name in OPTION_COLUMNS}
+
+
+class OptionUploadWorkflow:
+    ADD_OPTION_URL = f"{BASE_URL}/SA_opt_edit.asp?action=add"
+    # True when the page already holds an empty add form, as the server shows
+    # after a successful submission.
+    FRESH_ADD_FORM = """() => {
+        const descrip = document.querySelector('#optionDescrip');
+        return !!descrip && descrip.value === '' && !!document.querySelector('#ref')
+            && Array.from(document.querySelectorAll('button')).some(b => b.textContent.includes('Ajouter'));
+    }"""
+    WAITS = {
+        "open_add_form": WaitForNavigation("commit"),
+        # Any of the result messages means the submission has been processed; if
+        # none shows up, handle_submission_result reports it as unexpected. A
+        # reused form still shows the previous row's message, so the markers
+        # are only looked for on the page the submission navigated to.
+        "submit_option": WaitForSelector('text="Option déjà créée"', 'text="Session expirée"',
+                                         'text="Option ajoutée avec succès"',
+                                         timeout=RESULT_MARKER_TIMEOUT, optional=True, after_navigation=True),
+    }
+
+    def __init__(self, excel_file, browser_pool, headless, concurrency=UPLOAD_CONCURRENCY, reporter=None,
+                 use_http=False, resume=False, shard=None):
+        self.excel_file = excel_file
+        self.browser_pool = browser_pool
+        self.headless = headless
+        self.concurrency = max(1, concurrency)
+        self.reporter = reporter or Reporter()
+        self.use_http = use_http
+        self.resume = resume
+        # (index, count): upload only the rows hashed to this shard.
+        self.shard = shard
+        self.rate_limiter = get_rate_limiter()
+        self.metrics = get_step_metrics()
+        self.retry = None
+        self.catalog = None
+        self.journal = None
+        self.validator = PreflightValidator()
+        self.rejected_report = None
+
+    async def run(self):
+        reporter = self.reporter
+        self.retry = RetryPolicy(reporter)
+        transport = None
+        try:
+            reporter.log("Starting the upload process...")
+            rows = iter_option_rows(self.excel_file)
+            total_hint = asyncio.create_task(asyncio.to_thread(row_count_hint, self.excel_file))
+
+            if self.use_http:
+                from http_transport import HttpOptionTransport
+                transport = HttpOptionTransport(self.browser_pool.username, self.browser_pool.password,
+                                                pool_size=self.concurrency)
+                with self.metrics.step("upload-http", "login"):
+                    logged_in = await self.retry.run(lambda: asyncio.to_thread(transport.login), "Login")
+                if not logged_in:
+                    reporter.error("Login failed. Please check your username and password.")
+                    return
+
+            self.catalog = OptionCatalog()
+            await self.load_reference_data(transport)
+            self.rejected_report = RejectedRowsReport(self.rejected_report_path())
+
+            job_key = await asyncio.to_thread(file_digest, self.excel_file)
+            if self.shard is not None:
+                job_key = f"{job_key}:shard{self.shard[0]}of{self.shard[1]}"
+            self.journal = JobJournal("upload", job_key)
+            completed = self.journal.begin(self.resume)
+            if completed:
+                reporter.log(f"Resuming: {len(completed)} options were already processed in a previous run.")
+
+            # The work queue is bounded so the reader never runs far ahead of
+            # the uploaders and memory stays flat whatever the file size.
+            work = asyncio.Queue(maxsize=self.concurrency * 2)
+            results = asyncio.Queue()
+            if self.use_http:
+                # The submitters share the transport's cookies, so they share one guard too.
+                guard = SessionGuard(lambda stale: self.retry.run(
+                    lambda: asyncio.to_thread(transport.renew_session, stale), "Login"), transport.generation)
+                workers = [asyncio.create_task(self.upload_rows_http(transport, guard, work, results))
+                           for _ in range(self.concurrency)]
+            else:
+                workers = [asyncio.create_task(self.upload_rows(work, results))
+                           for _ in range(self.concurrency)]
+            reader = asyncio.create_task(self.read_rows(rows, completed, work, results, len(workers)))
+
+            # Pages finish out of order; buffer results so the log and progress
+            # bar still advance row by row. The reader posts the row count,
+            # with no messages, once the whole file has been read.
+            pending = {}
+            next_position = 0
+            total_rows = None
+            failed = 0
+            while total_rows is None or next_position < total_rows:
+                position, messages = await results.get()
+                if messages is None:
+                    total_rows = position
+                    continue
+                pending[position] = messages
+                while next_position in pending:
+                    expected = total_rows or (total_hint.result() if total_hint.done() else None)
+                    messages = pending.pop(next_position)
+                    # Rows belonging to other shards come back with no messages.
+                    if messages:
+                        reporter.status(f"Processing option {next_position + 1} of {expected or '?'}")
+                        reporter.log(f"Processing option {next_position + 1} of {expected or '?'}")
+                    for message in messages:
+                        reporter.log(message)
+                        if outcome_of(message) == "failed":
+                            failed += 1
+                    next_position += 1
+                    if expected:
+                        reporter.progress(min(100, int(next_position / expected * 100)))
+
+            await reader
+            await asyncio.gather(*workers)
+            reporter.progress(100)
+            # One error for the whole run, so callers that only watch errors
+            # (the CLI's exit status, the job queue) see the failed rows.
+            if failed:
+                reporter.error(f"{failed} options could not be uploaded; see the log for details.")
+            if self.rejected_report.count:
+                reporter.log(f"{self.rejected_report.count} rows failed pre-flight validation, "
+                             f"see {self.rejected_report.path}")
+
+        except Exception as e:
+            reporter.error(f"An error occurred: {str(e)}")
+            reporter.log(f"Critical error: {str(e)}")
+        finally:
+            self.retry.close()
+            if transport is not None:
+                transport.close()
+            if self.catalog is not None:
+                self.catalog.close()
+            if self.journal is not None:
+                self.journal.close()
+            if self.rejected_report is not None:
+                self.rejected_report.close()
+
+        reporter.status("Upload process completed.")
+        reporter.log("Upload process completed. Check the log for details.")
+
+    async def read_rows(self, rows, completed, work, results, worker_count):
+        position = 0
+        try:
+            while True:
+                batch = await asyncio.to_thread(lambda: list(islice(rows, READ_BATCH_SIZE)))
+                if not batch:
+                    break
+                positions = []
+                fresh = []
+                for row in batch:
+                    if not self.in_shard(row):
+                        results.put_nowait((position, []))
+                    elif position in completed:
+                        results.put_nowait((position, ["Option already processed in a previous run. Skipping..."]))
+                    else:
+                        positions.append(position)
+                        fresh.append(row)
+                    position += 1
+                if not positions:
+                    continue
+
+                # Counted rows that have neither a result nor an uploader yet.
+                unanswered = set(positions)
+                try:
+                    accepted, rejected = await asyncio.to_thread(self.validator.validate, positions, fresh)
+                    for row_position, row, reasons in rejected:
+                        self.rejected_report.add(row_position, row, reasons)
+                        results.put_nowait((row_position, [f"Row rejected before upload: {reasons}."]))
+                        unanswered.discard(row_position)
+                    for row_position, row in accepted:
+                        if self.catalog.contains(row["ref"], row["optionDescrip"]):
+                            results.put_nowait((row_position, ["Option already in the catalog. Skipping..."]))
+                        else:
+                            await work.put((row_position, row))
+                        unanswered.discard(row_position)
+                except Exception as e:
+                    # The reporting loop waits for a result at every counted
+                    # position; fail these rows so it can finish.
+                    for row_position in sorted(unanswered):
+                        results.put_nowait((row_position, [f"Error processing option {row_position + 1}: {str(e)}"]))
+                    raise
+        finally:
+            for _ in range(worker_count):
+                await work.put(None)
+            results.put_nowait((position, None))
+
+    def rejected_report_path(self):
+        base = os.path.splitext(self.excel_file)[0]
+        if self.shard is not None:
+            return f"{base}.rejected.shard{self.shard[0]}.csv"
+        return f"{base}.rejected.csv"
+
+    def in_shard(self, row):
+        # Hashing the option key keeps duplicates of a row in the same shard,
+        # where pre-flight validation can still catch them.
+        if self.shard is None:
+            return True
+        index, count = self.shard
+        fields = option_fields(row)
+        ref, description = OptionCatalog.key(fields["ref"], fields["optionDescrip"])
+        return zlib.crc32(f"{ref}\x1f{description}".encode("utf-8")) % count == index
+
+    async def load_reference_data(self, transport):
+        # Each page is retried on its own, so a transient error does not
+        # restart a catalog crawl from the first page.
+        if transport is not None:
+            await self.refresh_reference_data(lambda url: self.retry.run(
+                lambda: asyncio.to_thread(transport.fetch_text, url), url))
+        else:
+            async with self.browser_pool.lease(self.headless) as context:
+                await self.refresh_reference_data(lambda url: self.retry.run(lambda: fetch_text(context, url), url))
+
+    async def refresh_reference_data(self, fetch):
+        # Shards share the catalog database, which the parent refreshed before
+        # starting them.
+        if self.shard is None:
+            try:
+                with self.metrics.step("upload", "catalog-refresh"):
+                    added = await self.catalog.refresh(fetch)
+                if added:
+                    self.reporter.log(f"Option catalog updated with {added} existing options.")
+            except Exception as e:
+                # A stale catalog only means more duplicates reach the server.
+                self.reporter.log(f"Could not refresh the option catalog: {str(e)}")
+
+        try:
+            self.validator.allowed_delais = await allowed_delai_values(fetch)
+        except Exception as e:
+            self.reporter.log(f"Could not load the allowed iddelai values, they will not be pre-checked: {str(e)}")
+
+    def record_result(self, position, row, message):
+        # Returns the row's log messages. The server has already answered, so
+        # a failed local write is logged on its own, not as a failed row.
+        done = message in ("Option added successfully.", "Option already exists. Skipping...")
+        messages = [message]
+        if done:
+            fields = option_fields(row)
+            try:
+                self.catalog.add(fields["ref"], fields["optionDescrip"])
+            except Exception as e:
+                messages.append(f"Could not add option {position + 1} to the catalog: {str(e)}")
+        try:
+            self.journal.record(position, done, message)
+        except Exception as e:
+            messages.append(f"Could not journal option {position + 1}: {str(e)}")
+        return messages
+
+    async def upload_rows(self, work, results):
+        # The context is leased on the first row, so skipped rows cost nothing.
+        item = await work.get()
+        try:
+            if item is None:
+                return
+            async with self.browser_pool.lease(self.headless) as context:
+                page = await context.new_page()
+                guard = self.browser_pool.session_guard(context, self.headless)
+                while item is not None:
+                    position, row = item
+                    results.put_nowait((position, await self.upload_row(page, guard, position, row)))
+                    item = await work.get()
+        except Exception as e:
+            # This page is gone; fail the rows it would have taken so the
+            # reporting loop never waits on them.
+            while item is not None:
+                results.put_nowait((item[0], [f"Error processing option {item[0] + 1}: {str(e)}"]))
+                item = await work.get()
+
+    async def upload_row(self, page, guard, position, row):
+        try:
+            message = await guard.run(lambda: self.retry.run(lambda: self.submit_row(page, position, row),
+                                                             f"Option {position + 1}"))
+        except Exception as e:
+            return [f"Error processing option {position + 1}: {str(e)}"]
+        return self.record_result(position, row, message)
+
+    async def submit_row(self, page, position, row):
+        async with self.rate_limiter.slot():
+            with self.metrics.step("upload", "navigate", position):
+                await self.open_add_form(page)
+            with self.metrics.step("upload", "fill", position):
+                await self.fill_option_form(page, row)
+            with self.metrics.step("upload", "submit", position):
+                await self.submit_option(page)
+            with self.metrics.step("upload", "result-detect", position):
+                return await self.handle_submission_result(page)
+
+    async def submit_row_http(self, transport, position, row):
+        async with self.rate_limiter.slot():
+            with self.metrics.step("upload-http", "submit", position):
+                return await asyncio.to_thread(transport.submit_option, option_fields(row))
+
+    async def upload_rows_http(self, transport, guard, work, results):
+        while (item := await work.get()) is not None:
+            position, row = item
+            try:
+                message = await guard.run(lambda: self.retry.run(
+                    lambda: self.submit_row_http(transport, position, row), f"Option {position + 1}"))
+            except Exception as e:
+                results.put_nowait((position, [f"Error processing option {position + 1}: {str(e)}"]))
+                continue
+            results.put_nowait((position, self.record_result(position, row, message)))
+
+    async def open_add_form(self, page):
+        if "SA_opt_edit.asp" in page.url and await page.evaluate(self.FRESH_ADD_FORM):
+            return
+        await self.WAITS["open_add_form"].goto(page, self.ADD_OPTION_URL)
+        await check_page(page)
+
+    async def fill_option_form(self, page, row):
+        fields = option_fields(row)
+        await page.fill("#optionDescrip", fields["optionDescrip"])
+        await page.fill("#ref", fields["ref"])
+        await page.fill("#pricetoadd", fields["pricetoadd"])
+        await page.fill("#prixpublic", fields["prixpublic"])
+        await page.select_option("#iddelai", fields["iddelai"])
+
+    async def submit_option(self, page):
+        await self.WAITS["submit_option"].perform(page, lambda: page.click('button:has-text("Ajouter")'))
+
+    async def handle_submission_result(self, page):
+        if await page.query_selector('text="Option déjà créée"'):
+            return "Option already exists. Skipping..."
+        elif await page.query_selector('text="Option ajoutée avec succès"'):
+            return "Option added successfully."
+        # The guard logs in again and replays the row.
+        await check_page(page)
+        return "Unexpected result after submission. Check manually."
+
+
+class GroupOptionsWorkflow:
+    WAITS = {
+        "open_group_page": WaitForNavigation("domcontentloaded"),
+        "open_groups_list": WaitForNavigation("commit"),
+        "search_group": WaitForNavigation("domcontentloaded"),
+        "open_group": WaitForSelector('input[name="rch"]'),
+        "search_option": WaitForNavigation("domcontentloaded"),
+        "update_group": WaitForNavigation("commit"),
+    }
+
+    # One entry per inclureN checkbox on the listing: its name, state and the
+    # text of every cell in its row.
+    READ_LISTING = """els => els.map(el => ({
+        name: el.name,
+        checked: el.checked,
+        cells: Array.from(el.closest('tr') ? el.closest('tr').cells : []).map(cell => cell.innerText.trim()),
+    }))"""
+    CHECK_BOXES = "(els, names) => els.filter(el => names.includes(el.name) && !el.checked).forEach(el => el.click())"
+    LISTING_CHECKBOXES = 'input[type="checkbox"][name^="inclure"]'
+
+    def __init__(self, group_name, options, browser_pool, headless, reporter=None, batch=GROUP_BATCH_MODE,
+                 resume=False):
+        self.group_name = group_name
+        self.options = options
+        self.browser_pool = browser_pool
+        self.headless = headless
+        self.reporter = reporter or Reporter()
+        self.rate_limiter = get_rate_limiter()
+        self.group_directory = get_group_directory()
+        self.metrics = get_step_metrics()
+        self.batch = batch
+        self.resume = resume
+        self.retry = None
+        self.journal = None
+
+    async def run(self):
+        self.retry = RetryPolicy(self.reporter)
+        try:
+            self.journal = JobJournal("group-options", self.group_name)
+            completed = self.journal.begin(self.resume)
+            if completed:
+                self.options = [option_name for option_name in self.options if option_name.strip() not in completed]
+                self.reporter.status(f"Resuming: {len(completed)} options were already added in a previous run.")
+
+            async with self.browser_pool.lease(self.headless) as context:
+                page = await context.new_page()
+
+                if not await self.navigate_to_option_group(page, self.group_name):
+                    return
+
+                # Each attempt reopens the group page if needed, so the cookies are all a replay needs.
+                guard = self.browser_pool.session_guard(context, self.headless)
+                if self.batch:
+                    await self.attach_options_in_batches(page, guard)
+                    self.reporter.status("Process completed successfully.")
+                    return
+
+                total_options = len(self.options)
+                for i, option_name in enumerate(self.options, 1):
+                    try:
+                        added = await guard.run(lambda: self.retry.run(
+                            lambda: self.add_option_with_slot(page, option_name), option_name))
+                    except Exception as e:
+                        self.reporter.error(f"Error adding option '{option_name}': {str(e)}")
+                        continue
+                    self.journal.record(option_name.strip(), added)
+                    if not added:
+                        continue
+                    progress = int((i / total_options) * 100)
+                    self.reporter.progress(progress)
+                    self.reporter.status(f"Added option: {option_name}")
+
+                self.reporter.status("Process completed successfully.")
+        except Exception as e:
+            self.reporter.error(f"An unexpected error occurred: {str(e)}")
+        finally:
+            self.retry.close()
+            if self.journal is not None:
+                self.journal.close()
+
+    async def navigate_to_option_group(self, page, group_name):
+        with self.metrics.step("group-options", "navigate", group_name):
+            return await self._navigate_to_option_group(page, group_name)
+
+    async def _navigate_to_option_group(self, page, group_name):
+        try:
+            self.reporter.status(f"Navigating to option group: {group_name}")
+            group_page = self.group_directory.group_page(group_name)
+            if group_page:
+                await self.WAITS["open_group_page"].goto(page, group_page)
+                if await page.locator('input[name="rch"]').count():
+                    return True
+                await check_page(page)
+                self.group_directory.forget_group_page(group_name)
+
+            await self.WAITS["open_groups_list"].goto(page, f"{BASE_URL}/options/optionsgroupslist.asp")
+            await check_page(page)
+            await page.fill("#psearch", group_name)
+            await self.WAITS["search_group"].perform(page, lambda: page.click('button:has-text("Rechercher")'))
+
+            if await page.locator('img[alt=" Ajouter/retirer des options "]').count() == 0:
+                self.reporter.error(f"Option group '{group_name}' not found. Please check the group name.")
+                return False
+
+            await self.WAITS["open_group"].perform(page, lambda: page.click('img[alt=" Ajouter/retirer des options "]'))
+            self.group_directory.remember_group_page(group_name, page.url)
+            return True
+        except Exception as e:
+            self.reporter.error(f"Error navigating to option group: {str(e)}")
+            return False
+
+    async def attach_options_in_batches(self, page, guard):
+        remaining = {}
+        for option_name in self.options:
+            remaining.setdefault(option_name.strip().casefold(), option_name.strip())
+        total_options = len(remaining)
+
+        # Start with the broadest search covering every name (the unfiltered
+        # listing when they share no prefix), then search the leftovers by name.
+        queries = [os.path.commonprefix(list(remaining.values()))] + list(remaining.values())
+        searched = set()
+        for query in queries:
+            if not remaining:
+                break
+            if query in searched or (searched and query.casefold() not in remaining):
+                continue
+            searched.add(query)
+
+            try:
+                attached = await guard.run(lambda: self.retry.run(
+                    lambda: self.attach_with_slot(page, query, remaining), query or "(all)"))
+            except Exception as e:
+                self.reporter.error(f"Error adding options matching '{query}': {str(e)}")
+                continue
+
+            for key in attached:
+                option_name = remaining.pop(key)
+                self.journal.record(option_name, True)
+                self.reporter.progress(int((total_options - len(remaining)) / total_options * 100))
+                self.reporter.status(f"Added option: {option_name}")
+
+        for option_name in remaining.values():
+            self.reporter.error(f"Option '{option_name}' not found. Skipping this option.")
+
+    async def return_to_group(self, page):
+        # A retry or a replay starts wherever the failed attempt left the page.
+        if await page.locator('input[name="rch"]').count():
+            return
+        if not await self.navigate_to_option_group(page, self.group_name):
+            raise RuntimeError(f"Could not reopen option group '{self.group_name}'.")
+
+    async def attach_with_slot(self, page, query, remaining):
+        await self.return_to_group(page)
+        async with self.rate_limiter.slot():
+            return await self.attach_from_search(page, query, remaining)
+
+    async def attach_from_search(self, page, query, remaining):
+        self.reporter.status(f"Searching options: {query or '(all)'}")
+        with self.metrics.step("group-options", "search", query):
+            await page.fill('input[name="rch"]', query)
+            await self.WAITS["search_option"].perform(page, lambda: page.click('button:has-text("Rechercher")'))
+            # An empty listing from an expired session would read as "not found".
+            await check_page(page)
+            rows = await page.eval_on_selector_all(self.LISTING_CHECKBOXES, self.READ_LISTING)
+        attached = []
+        to_check = []
+        for row in rows:
+            for cell in row["cells"]:
+                key = cell.casefold()
+                if key in remaining and key not in attached:
+                    attached.append(key)
+                    to_check.append(row["name"])
+                    break
+
+        # A search for one exact name that returns a single row is that option,
+        # even if the listing decorates its label.
+        key = query.casefold()
+        if not attached and key in remaining and len(rows) == 1:
+            attached.append(key)
+            to_check.append(rows[0]["name"])
+
+        if any(not row["checked"] for row in rows if row["name"] in to_check):
+            with self.metrics.step("group-options", "submit", query):
+                await page.eval_on_selector_all(self.LISTING_CHECKBOXES, self.CHECK_BOXES, to_check)
+                await self.WAITS["update_group"].perform(page, lambda: page.click("button:has-text('Mettre à jour')"))
+                await check_page(page)
+        return attached
+
+    async def read_members(self, page):
+        # The unfiltered listing ticks every option already in the group.
+        await page.fill('input[name="rch"]', "")
+        await self.WAITS["search_option"].perform(page, lambda: page.click('button:has-text("Rechercher")'))
+        rows = await page.eval_on_selector_all(self.LISTING_CHECKBOXES, self.READ_LISTING)
+        return {cell.casefold() for row in rows if row["checked"] for cell in row["cells"] if cell}
+
+    async def add_option_with_slot(self, page, option_name):
+        await self.return_to_group(page)
+        async with self.rate_limiter.slot():
+            return await self.add_option_to_group(page, option_name)
+
+    async def add_option_to_group(self, page, option_name):
+        self.reporter.status(f"Adding option: {option_name}")
+        with self.metrics.step("group-options", "search", option_name):
+            await page.fill('input[name="rch"]', option_name.strip())
+            await self.WAITS["search_option"].perform(page, lambda: page.click('button:has-text("Rechercher")'))
+            await check_page(page)
+
+        checkbox = page.locator('input[type="checkbox"][name="inclure0"]')
+        if await checkbox.is_visible():
+            with self.metrics.step("group-options", "submit", option_name):
+                await checkbox.check()
+                await self.WAITS["update_group"].perform(page, lambda: page.click("button:has-text('Mettre à jour')"))
+                await check_page(page)
+            return True
+        else:
+            self.reporter.error(f"Option '{option_name}' not found. Skipping this option.")
+            return False
+
+
+class ProductGroupWorkflow:
+    WAITS = {
+        "open_product": WaitForNavigation("commit"),
+        # Wait for the server to answer the post before the next goto can
+        # cancel it; a failed answer is raised for the retry layer.
+        "add_to_group": WaitForResponse("SA_prod_edit.asp", method="POST", after_navigation=True),
+    }
+
+    def __init__(self, product_ids, group_name, browser_pool, headless, reporter=None, resume=False):
+        self.product_ids = product_ids
+        self.group_name = group_name
+        self.browser_pool = browser_pool
+        self.headless = headless
+        self.reporter = reporter or Reporter()
+        self.resume = resume
+        self.rate_limiter = get_rate_limiter()
+        self.group_directory = get_group_directory()
+        self.metrics = get_step_metrics()
+        self.retry = None
+        self.group_id = None
+        self.journal = None
+
+    async def run(self):
+        self.journal = JobJournal("product-group", self.group_name)
+        completed = self.journal.begin(self.resume)
+        if completed:
+            self.product_ids = [product_id for product_id in self.product_ids if product_id not in completed]
+            self.reporter.log(f"Resuming: {len(completed)} products were already added in a previous run.")
+        if not self.product_ids:
+            self.journal.close()
+            return
+        self.retry = RetryPolicy(self.reporter)
+        try:
+            async with self.browser_pool.lease(self.headless) as context:
+                # Every product starts from its own URL, so a replay needs no repositioning.
+                guard = self.browser_pool.session_guard(context, self.headless)
+                with self.metrics.step("product-group", "resolve-group", self.group_name):
+                    self.group_id = await guard.run(lambda: self.retry.run(lambda: self.group_directory.group_id(
+                        self.group_name, lambda url: fetch_text(context, url), self.product_ids[0])))
+                if self.group_id is None:
+                    self.reporter.error(f"Option group '{self.group_name}' not found. Please check the group name.")
+                    return
+
+                page = await context.new_page()
+                for product_id in self.product_ids:
+                    try:
+                        await guard.run(lambda: self.retry.run(lambda: self.add_product_with_slot(page, product_id),
+                                                               f"Product {product_id}"))
+                    except Exception as e:
+                        # Left out of the journal, so a resumed run tries it again.
+                        self.reporter.error(f"Error adding product {product_id}: {str(e)}")
+                        continue
+                    self.journal.record(product_id, True)
+        except Exception as e:
+            self.reporter.error(f"An error occurred: {str(e)}")
+        finally:
+            self.retry.close()
+            self.journal.close()
+
+    async def add_product_with_slot(self, page, product_id):
+        async with self.rate_limiter.slot():
+            await self.add_product_to_group(page, product_id)
+
+    async def add_product_to_group(self, page, product_id):
+        self.reporter.log(f"Navigating to product page for ID: {product_id}")
+        self.reporter.progress(60)
+        with self.metrics.step("product-group", "navigate", product_id):
+            await self.WAITS["open_product"].goto(page, f"{BASE_URL}/SA_prod_edit.asp?action=edit&recid={product_id}")
+            await check_page(page)
+
+        self.reporter.log(f"Selecting group: {self.group_name} for product ID {product_id}")
+        self.reporter.progress(80)
+        with self.metrics.step("product-group", "fill", product_id):
+            await page.select_option("select#idOptionGroup", value=self.group_id)
+
+        self.reporter.log(f"Clicking 'Add' button for product ID {product_id}")
+        with self.metrics.step("product-group", "submit", product_id):
+            await page.wait_for_selector("button[type='submit']:has-text('Ajouter'):not(:has-text('le fournisseur'))")
+            response = await self.WAITS["add_to_group"].perform(
+                page, lambda: page.click("button[type='submit']:has-text('Ajouter'):not(:has-text('le fournisseur'))"))
+            raise_for_status(response)
+            await check_page(page)
+
+        self.reporter.log(f"Added product {product_id} to group {self.group_name}")
+        self.reporter.progress(100)